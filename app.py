@@ -1,150 +1,167 @@
 import streamlit as st
-from PIL import Image
-import json
 
+import os
 import sys
+import time
 sys.path.append(r'C:\Users\devanshi\AppData\Roaming\Python\Python313\site-packages')
 
-import pytesseract
+from insights.detect import detect_graph_from_document, detection_stats
+from insights.ingest import ingest_image
+from insights.ocr_cache import cache_stats
 
-from insights.match_insights import (
-    detect_match_graph_type_from_image,
-    summarize_manhattan,
-    summarize_worm,
-    summarize_run_rate,
-    summarize_wickets_pie,
-    summarize_partnership,
-    summarize_types_of_runs,
-)
-
-from insights.player_insights import (
-    detect_player_graph_type_from_image,
-    summarize_player_current_form,
-    summarize_player_playing_style,
-    summarize_shot_analysis_runs,
-    summarize_shot_analysis_outs,
-    summarize_player_wagon_wheel,
-    summarize_batting_position,
-    summarize_player_run_types,
-    summarize_vs_bowling_type,
-)
-
-from insights.team_insights import(
-    detect_team_graph_type_from_image,
-    summarize_team_current_form,
-    summarize_team_toss_insights,
-)
+from insights.metrics import METRICS, finish_request, stage, start_request, write_metrics
+from insights.snapshot import dump_snapshot, is_snapshot, load_upload
+from insights.panels import detect_panels
+from insights.pipeline import panel_summary, summary_fields, summary_from_result
+from insights.registry import build_summary
+from insights.render import render_summary
+from insights.result_cache import RESULT_CACHE, content_hash, result_cache_stats
 
 st.set_page_config(page_title="Cricket Graph Explainer", layout="centered")
 
 st.title("🏏 Cricket Graph Explainer")
 st.write("Upload a cricket graph (Manhattan, Worm, or Run Rate) to get a summary.")
 
+# ⏱️ Every rerun is one request; stages below are recorded into it.
+show_timings = st.sidebar.checkbox("Show timing panel", value=False)
+request_stages = start_request(trace_memory=show_timings)
+request_started = time.perf_counter()
+graph_type = None
 
 
-def detect_graph_category_from_image(image):
-    try:
-        text = pytesseract.image_to_string(image).lower()
-        if any(kw in text for kw in ["type of runs"]):  # singular
-            return "match"
-        elif any(kw in text for kw in ["types of runs"]):  # plural
-            return "player"
-        
-        elif any(kw in text for kw in ["current form"]):
-            if any(kw in text for kw in ["score"]) or any(kw in text for kw in ["out type"]):
-                 return "player"
-            else:
-                return "team"
-            
-        elif any(kw in text for kw in ["manhattan", "worm", "run rate", "partnership", "wickets pie"]):
-            return "match"
-        elif any(kw in text for kw in ["playing style", "wagon wheel", "shots analysis", "batting position", "bowling type"]):
-            return "player"
-        elif any(kw in text for kw in ["toss insights", "win toss", "bat first", "field first"]):
-            return "team"
-    except Exception as e:
-        print("Category detection failed:", e)
+# --- Upload Section ---
+uploaded_file = st.file_uploader("Upload a graph image", type=["png", "jpg", "jpeg"])
+json_file = st.file_uploader("Upload match JSON file (or a saved snapshot)", type=["json", "snap"])
 
-    return "unknown"
+# 🗄️ This exact image + JSON was summarized before (in any session)? Reuse it.
+cached = None
+if uploaded_file is not None and json_file is not None:
+    with stage("result_cache"):
+        cached = RESULT_CACHE.get(uploaded_file.getvalue(), json_file.getvalue())
 
 
-# --- Upload Section ---
-uploaded_file = st.file_uploader("Upload a graph image", type=["png", "jpg", "jpeg"])
-json_file = st.file_uploader("Upload match JSON file", type=["json"])
+def show_summary(category, graph_type, data):
+    if cached is not None:
+        summary = summary_from_result(cached)
+    else:
+        summary = build_summary(category, graph_type, data)
+        if summary is None:
+            return False
+        RESULT_CACHE.put(uploaded_file.getvalue(), json_file.getvalue(),
+                         {"category": category, "graph_type": graph_type, **summary_fields(summary)})
+    render_summary(summary)
+    return True
+
+
+# Serializing the aggregates is the costly part of a snapshot, so it is done
+# once per upload (keyed by its hash) rather than on every rerun.
+@st.cache_data(max_entries=16, show_spinner=False)
+def snapshot_bytes(upload_hash, _document, _aggregates):
+    return dump_snapshot(_document, _aggregates)
+
 
 match_data = None
-if json_file is not None:
+match_aggregates = None
+if cached is not None:
+    st.success("Match data loaded successfully!")
+elif json_file is not None:
     try:
-        match_data = json.load(json_file)
+        # Match deliveries are streamed straight into the aggregates shared
+        # by every match summary; player/team payloads come back whole.
+        match_data, match_aggregates = load_upload(json_file)
         st.success("Match data loaded successfully!")
     except Exception as e:
         st.error(f"Error loading JSON: {e}")
 
-if uploaded_file is not None:
-    image = Image.open(uploaded_file)
+# 💾 Snapshot of the aggregates: upload it next time instead of the JSON to skip parsing
+if match_data is not None and not is_snapshot(json_file.getvalue()):
+    st.sidebar.download_button(
+        "Download snapshot", snapshot_bytes(content_hash(json_file.getvalue()), match_data, match_aggregates),
+        file_name=os.path.splitext(json_file.name)[0] + ".snap", mime="application/octet-stream",
+    )
+
+have_json = cached is not None or match_data is not None
+have_match = cached is not None or match_aggregates is not None
+
+image = None
+panels = cached.get("panels", []) if cached is not None else []
+if cached is not None:
+    st.image(uploaded_file.getvalue(), caption="Uploaded Graph", use_container_width=True)
+    category, graph_type = cached["category"], cached["graph_type"]
+
+elif uploaded_file is not None:
+    # 🖼️ One bounded decode serves both the preview and OCR; oversized uploads stop here
+    try:
+        image = ingest_image(uploaded_file.getvalue())
+    except ValueError as e:
+        st.error(f"❌ {e}")
+        uploaded_file = None
+
+if image is not None:
     st.image(image, caption="Uploaded Graph", use_container_width=True)
-    
-    # 🧠 New step: Detect graph category
-    category = detect_graph_category_from_image(image)
+
+    # ⚡ Player/team JSON usually names its graph outright; only OCR when it doesn't
+    detected = detect_graph_from_document(match_data) if match_data is not None else None
+    if detected:
+        category, graph_type = detected
+    else:
+        # 🧩 Dashboards hold several charts: each panel is detected on its own, in parallel
+        found = detect_panels(image)
+        category, graph_type = found[0].category, found[0].graph_type
+        if len(found) > 1:
+            panels = [{"category": p.category, "graph_type": p.graph_type, "box": list(p.box)} for p in found]
+
+if panels:
+    st.markdown(f"### 🧩 Detected {len(panels)} chart panels")
+    if not have_json:
+        st.warning("📄 Please upload the JSON file to continue.")
+    elif cached is None:
+        for panel in panels:
+            data = match_aggregates if panel["category"] == "match" else match_data
+            if data is not None:
+                panel.update(panel_summary(panel["category"], panel["graph_type"], data))
+        summarized = [p for p in panels if p.get("summary")]
+        if summarized:
+            first = {k: v for k, v in summarized[0].items() if k != "box"}
+            RESULT_CACHE.put(uploaded_file.getvalue(), json_file.getvalue(), dict(first, panels=panels))
+
+    for i, panel in enumerate(panels, 1):
+        label = (panel["graph_type"] or "unknown graph").replace("_", " ").title()
+        st.markdown(f"#### Panel {i}: {panel['category'].capitalize()} · {label}")
+        if image is not None:
+            st.image(image.crop(tuple(panel["box"])), use_container_width=True)
+        if panel.get("summary"):
+            render_summary(summary_from_result(panel))
+        elif have_json:
+            st.warning("⚠️ No summary for this panel.")
+
+elif uploaded_file is not None:
     st.markdown(f"### 📂 Detected Category: **{category.capitalize()} Insight**")
     if category == "match":
-        graph_type = detect_match_graph_type_from_image(image)
         st.markdown(f"### 📝 Detected Graph Type: **{graph_type}**")
 
-        if graph_type == "Manhattan":
-            summarize_manhattan(match_data)
-        elif graph_type == "Worm":
-            summarize_worm(match_data)
-        elif graph_type == "Run Rate":
-            summarize_run_rate(match_data)
-        elif graph_type == "Wickets Pie":
-            summarize_wickets_pie(match_data)
-        elif graph_type == "Partnership":
-            summarize_partnership(match_data)
-        elif graph_type == "Types of Runs":
-            summarize_types_of_runs(match_data)
-        else:
+        if not have_match:
+            st.warning("📄 Please upload a match JSON file to continue.")
+        elif not show_summary(category, graph_type, match_aggregates):
             st.error("❌ Could not identify match graph type.")
 
     elif category == "player":
-        if match_data is not None:
-            player_graph_type = detect_player_graph_type_from_image(image)
-            if player_graph_type:
-                st.markdown(f"### 📝 Detected Player Graph: **{player_graph_type.replace('_', ' ').title()}**")
-                if player_graph_type == "player_current_form":
-                    summarize_player_current_form(match_data["data"])
-                elif  player_graph_type == "player_playing_style":
-                    summarize_player_playing_style(match_data["data"])
-                elif player_graph_type == "player_wagon_wheel":
-                    summarize_player_wagon_wheel(match_data["data"])
-                elif player_graph_type == "player_shot_analysis_runs":
-                    summarize_shot_analysis_runs(match_data["data"])
-                elif player_graph_type == "player_shot_analysis_outs":
-                    summarize_shot_analysis_outs(match_data["data"])
-                elif player_graph_type =="player_position":
-                    summarize_batting_position(match_data["data"])
-                elif player_graph_type =="player_vs_bowling":
-                    summarize_vs_bowling_type(match_data["data"])
-                elif player_graph_type =="player_run_types":
-                    summarize_player_run_types(match_data["data"])
-                else:
+        if have_json:
+            if graph_type:
+                st.markdown(f"### 📝 Detected Player Graph: **{graph_type.replace('_', ' ').title()}**")
+                if not show_summary(category, graph_type, match_data):
                     st.error("❌ Could not identify match graph type.")
-                
+
             else:
                 st.warning("⚠️ Could not detect player graph type from uploaded JSON.")
         else:
             st.warning("📄 Please upload a player JSON file to continue.")
 
     elif category == "team":
-            if match_data is not None:
-                team_graph_type = detect_team_graph_type_from_image(image)
-                if team_graph_type:
-                    st.markdown(f"### 🧢 Detected Team Graph: **{team_graph_type.replace('_', ' ').title()}**")
-                    if team_graph_type == "team_current_form":
-                        summarize_team_current_form(match_data["data"])
-                    elif team_graph_type == "team_toss_insights":
-                        summarize_team_toss_insights(match_data["data"])
-                    else:
+            if have_json:
+                if graph_type:
+                    st.markdown(f"### 🧢 Detected Team Graph: **{graph_type.replace('_', ' ').title()}**")
+                    if not show_summary(category, graph_type, match_data):
                         st.warning("⚠️ Team graph type not supported yet.")
                 else:
                     st.warning("⚠️ Could not detect team graph type from image.")
@@ -152,4 +169,38 @@ if uploaded_file is not None:
                 st.warning("📄 Please upload a team JSON file to continue.")
 
 
+ocr_stats = cache_stats()
+st.sidebar.caption(
+    f"OCR cache: {ocr_stats['memory_hits'] + ocr_stats['disk_hits']} hits, "
+    f"{ocr_stats['misses']} misses ({ocr_stats['hit_rate']:.0%} hit rate)"
+)
+result_stats = result_cache_stats()
+st.sidebar.caption(
+    f"Summary cache: {result_stats['hits']} hits, {result_stats['misses']} misses, "
+    f"{result_stats['entries']} stored"
+)
+detections = detection_stats()
+st.sidebar.caption(
+    f"Detection: {detections['schema']} from JSON, {detections['visual']} from image features, "
+    f"{detections['ocr']} via OCR "
+    f"({detections['fast_path_rate']:.0%} skipped OCR)"
+)
 
+if uploaded_file is not None or json_file is not None:
+    METRICS.observe("request", {"graph_type": graph_type or "unknown"}, time.perf_counter() - request_started, None)
+    if os.environ.get("METRICS_FILE"):
+        write_metrics(os.environ["METRICS_FILE"])
+
+if show_timings and request_stages:
+    with st.expander("⏱️ Timing for this request", expanded=True):
+        st.table([
+            {
+                "stage": "  " * r.depth + r.name + "".join(f" [{v}]" for v in r.labels.values()),
+                "ms": round(r.seconds * 1000, 2),
+                "peak KiB": None if r.peak_bytes is None else round(r.peak_bytes / 1024, 1),
+            }
+            for r in request_stages
+        ])
+
+# Memory tracing slows the whole process down: keep it to this request.
+finish_request(request_stages)
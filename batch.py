@@ -0,0 +1,104 @@
+"""Headless batch mode: detect and summarize many graph/JSON pairs at once.
+
+    python batch.py charts/ -o results.jsonl
+    python batch.py manifest.jsonl -o results.jsonl --workers 8
+
+A directory is paired by file stem (``worm.png`` + ``worm.json``, or a
+``worm.snap`` snapshot). A manifest is a JSONL file with
+``{"image": ..., "json": ...}`` per line, paths relative to the manifest.
+Set RESULT_CACHE_PATH to reuse results across runs (insights.result_cache).
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from insights.pipeline import explain_bytes
+
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+# A snapshot (insights.snapshot) stands in for the JSON when there is none.
+DATA_EXTENSIONS = (".json", ".snap")
+
+
+def find_pairs(path):
+    if os.path.isdir(path):
+        pairs = []
+        for name in sorted(os.listdir(path)):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in IMAGE_EXTENSIONS:
+                continue
+            candidates = (os.path.join(path, stem + data_ext) for data_ext in DATA_EXTENSIONS)
+            pairs.append((os.path.join(path, name), next(filter(os.path.exists, candidates), None)))
+        return pairs
+
+    base = os.path.dirname(os.path.abspath(path))
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            json_path = entry.get("json")
+            pairs.append((
+                os.path.join(base, entry["image"]),
+                os.path.join(base, json_path) if json_path else None,
+            ))
+    return pairs
+
+
+def process_pair(pair):
+    image_path, json_path = pair
+    started = time.perf_counter()
+    result = {"image": image_path, "json": json_path, "category": "unknown", "graph_type": None, "summary": []}
+
+    try:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+        json_bytes = None
+        if json_path is not None:
+            with open(json_path, "rb") as f:
+                json_bytes = f.read()
+        result.update(explain_bytes(image_bytes, json_bytes))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["seconds"] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a batch of cricket graphs.")
+    parser.add_argument("input", help="directory of image/JSON pairs or a JSONL manifest")
+    parser.add_argument("-o", "--output", default="results.jsonl", help="JSONL file to write")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    args = parser.parse_args(argv)
+
+    pairs = find_pairs(args.input)
+    if not pairs:
+        print("No images found.", file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    failures = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor, \
+            open(args.output, "w", encoding="utf-8") as out:
+        chunksize = max(1, len(pairs) // (args.workers * 4))
+        for result in executor.map(process_pair, pairs, chunksize=chunksize):
+            failures += "error" in result
+            out.write(json.dumps(result, ensure_ascii=False) + "\n")
+
+    elapsed = time.perf_counter() - started
+    print(
+        f"Processed {len(pairs)} images in {elapsed:.2f}s "
+        f"({len(pairs) / elapsed:.2f} images/s, {failures} failed) -> {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""Synthetic match, player and team payloads (and chart images) for benchmarks.
+
+Everything is deterministic for a given seed so runs are comparable.
+"""
+import random
+
+
+TEAMS = ["India", "Australia", "England", "South Africa", "New Zealand", "Pakistan", "Sri Lanka", "West Indies"]
+WICKET_KINDS = ["caught", "bowled", "lbw", "run out", "stumped", "caught and bowled", "hit wicket"]
+WICKET_WEIGHTS = [55, 18, 14, 7, 3, 2, 1]
+BATTER_RUNS = [0, 1, 2, 3, 4, 6]
+BATTER_RUN_WEIGHTS = [38, 34, 9, 1, 12, 6]
+BOWLING_TYPES = ["Right-arm fast", "Left-arm fast", "Right-arm off spin", "Left-arm orthodox", "Leg spin"]
+SHOTS = ["Cover drive", "Pull", "Cut", "Sweep", "Flick", "Straight drive", "Loft", "Defensive"]
+
+MATCH_TIERS = {
+    "t20": {"innings": 2, "overs": 20},
+    "odi": {"innings": 2, "overs": 50},
+    "test": {"innings": 4, "overs": 115},
+}
+
+
+def _squad(team, size=11):
+    return [f"{team} Batter {i + 1}" for i in range(size)]
+
+
+def generate_innings(rng, team, overs, wicket_rate=0.035, extras_rate=0.06):
+    batters = _squad(team)
+    striker, non_striker, next_in = 0, 1, 2
+    out_overs = []
+    for o in range(overs):
+        deliveries = []
+        for _ in range(6):
+            batter_runs = rng.choices(BATTER_RUNS, BATTER_RUN_WEIGHTS)[0]
+            extras = 1 if rng.random() < extras_rate else 0
+            delivery = {
+                "batter": batters[striker],
+                "bowler": f"Bowler {o % 5 + 1}",
+                "non_striker": batters[non_striker],
+                "runs": {"batter": batter_runs, "extras": extras, "total": batter_runs + extras},
+            }
+            if rng.random() < wicket_rate:
+                delivery["wickets"] = [{
+                    "player_out": batters[striker],
+                    "kind": rng.choices(WICKET_KINDS, WICKET_WEIGHTS)[0],
+                }]
+                deliveries.append(delivery)
+                if next_in >= len(batters):
+                    out_overs.append({"over": o, "deliveries": deliveries})
+                    return {"team": team, "overs": out_overs}
+                striker, next_in = next_in, next_in + 1
+                continue
+            deliveries.append(delivery)
+            if batter_runs % 2:
+                striker, non_striker = non_striker, striker
+        striker, non_striker = non_striker, striker
+        out_overs.append({"over": o, "deliveries": deliveries})
+    return {"team": team, "overs": out_overs}
+
+
+def generate_match(innings=2, overs=20, seed=0, teams=None, date="2024-01-01"):
+    rng = random.Random(seed)
+    teams = teams or rng.sample(TEAMS, 2)
+    return {
+        "info": {"dates": [date], "teams": list(teams)},
+        "innings": [generate_innings(rng, teams[i % 2], overs) for i in range(innings)],
+    }
+
+
+def generate_tier(tier, seed=0):
+    return generate_match(seed=seed, **MATCH_TIERS[tier])
+
+
+def generate_season(matches=1000, overs=20, seed=0):
+    rng = random.Random(seed)
+    season = []
+    for m in range(matches):
+        teams = rng.sample(TEAMS, 2)
+        season.append(generate_match(2, overs, seed=seed * 100003 + m, teams=teams,
+                                     date=f"2024-{m % 12 + 1:02d}-{m % 28 + 1:02d}"))
+    return season
+
+
+def generate_player_payload(entries=200, seed=0):
+    rng = random.Random(seed)
+    innings = max(5, entries // 20)
+    form = []
+    for _ in range(innings):
+        balls = rng.randint(1, 60)
+        runs = int(balls * rng.uniform(0.5, 1.8))
+        is_out = int(rng.random() < 0.8)
+        form.append({
+            "runs": runs,
+            "balls": balls,
+            "is_out": is_out,
+            "out_type": rng.choices(WICKET_KINDS, WICKET_WEIGHTS)[0] if is_out else "",
+        })
+
+    style, total = [], 0
+    for ball in range(1, entries + 1):
+        run = rng.choices(BATTER_RUNS, BATTER_RUN_WEIGHTS)[0]
+        total += run
+        style.append({"ball": ball, "runs": str(run), "SR": f"{total / ball * 100:.2f}"})
+
+    wagon = [{
+        "run": rng.choices(BATTER_RUNS[1:], BATTER_RUN_WEIGHTS[1:])[0],
+        "wagon_part": str(rng.randint(1, 6)),
+        "bowling_type_name": rng.choice(BOWLING_TYPES),
+        "shot_name": rng.choice(SHOTS),
+    } for _ in range(entries)]
+
+    positions = [{
+        "position": p,
+        "runs": rng.randint(20, 900),
+        "avg": f"{rng.uniform(10, 55):.2f}",
+        "SR": f"{rng.uniform(90, 170):.2f}",
+        "total_match": rng.randint(1, 40),
+    } for p in range(1, 8)]
+
+    run_types = []
+    for bowling_type in BOWLING_TYPES:
+        total_runs = rng.randint(50, 500)
+        boundaries = rng.randint(0, total_runs)
+        run_types.append({
+            "bowling_type_name": bowling_type,
+            "total_runs": total_runs,
+            "dot_balls": rng.randint(10, 200),
+            "per_dot_balls": rng.uniform(20, 60),
+            "boundaries_run": boundaries,
+        })
+
+    return {"data": {
+        "current_form_graph_data": form,
+        "playing_style_graph_data": {"all": style},
+        "wagon_wheel_graph_data": wagon,
+        "shot_runs_graph_data": [{"shot_name": s, "runs": rng.randint(0, 400)} for s in SHOTS],
+        "shot_outs_graph_data": [{"shot_name": s, "outs": rng.randint(0, 12)} for s in SHOTS],
+        "batting_position_graph_data": {"all": positions},
+        "types_of_runs_graph_data": run_types,
+        "statements": [],
+    }}
+
+
+def generate_vs_bowling_payload(seed=0):
+    rng = random.Random(seed)
+    return {"data": {"graph_data": [{
+        "bowling_type": bowling_type,
+        "average": f"{rng.uniform(10, 60):.2f}",
+        "strike_rate": f"{rng.uniform(80, 180):.2f}",
+        "wicket": f"{rng.uniform(0, 40):.1f}%",
+    } for bowling_type in BOWLING_TYPES]}}
+
+
+def generate_team_form_payload(matches=20, seed=0, team_id=2509267):
+    rng = random.Random(seed)
+    return {"data": {"team_id": team_id, "graph_data": [{
+        "team_name": "Synthetic XI",
+        "match_result": rng.choices(["resulted", "abandoned"], [9, 1])[0],
+        "won_team_id": team_id if rng.random() < 0.55 else 1,
+        "win_by": f"{rng.randint(1, 120)} runs",
+    } for _ in range(matches)]}}
+
+
+def generate_toss_payload(seed=0):
+    rng = random.Random(seed)
+    won = rng.randint(5, 30)
+    bat_first = rng.randint(0, won)
+    return {"data": {"graph_data": {
+        "team_name": "Synthetic XI",
+        "won_toss": won,
+        "lost_toss": rng.randint(5, 30),
+        "bat_first": bat_first,
+        "field_first": won - bat_first,
+        "won_bat_first": rng.randint(0, bat_first),
+        "won_field_first": rng.randint(0, won - bat_first),
+    }}}
+
+
+CHART_TITLES = {
+    "Manhattan": "Manhattan - Runs per over",
+    "Worm": "Worm - Cumulative runs",
+    "Run Rate": "Run Rate per over",
+    "Wickets Pie": "Wickets Pie - Dismissal type",
+    "Partnership": "Partnership",
+    "Types of Runs": "Type of runs",
+    "player_current_form": "Current Form - Score / Out type",
+    "player_wagon_wheel": "Wagon Wheel",
+    "player_playing_style": "Playing Style",
+    "player_vs_bowling": "Performance vs Bowling Type",
+    "team_current_form": "Team Current Form",
+    "team_toss_insights": "Toss Insights",
+}
+
+
+def render_chart(graph_type, size=(1280, 720), seed=0):
+    """Draw a simple chart with a title, axis labels and some marks."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    rng = random.Random(seed)
+    width, height = size
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    try:
+        title_font = ImageFont.load_default(size=max(12, height // 18))
+        label_font = ImageFont.load_default(size=max(10, height // 36))
+    except TypeError:
+        title_font = label_font = ImageFont.load_default()
+
+    draw.text((width // 20, height // 30), CHART_TITLES.get(graph_type, graph_type), fill="black", font=title_font)
+    draw.text((width // 2, height - height // 12), "Overs", fill="black", font=label_font)
+
+    left, top, right, bottom = width // 10, height // 5, width - width // 20, height - height // 7
+    draw.line((left, bottom, right, bottom), fill="black", width=2)
+    draw.line((left, top, left, bottom), fill="black", width=2)
+    if graph_type in ("Wickets Pie", "player_wagon_wheel"):
+        cx, cy, r = (left + right) // 2, (top + bottom) // 2, (bottom - top) // 2
+        start = 0
+        for i in range(5):
+            end = start + rng.randint(30, 100)
+            draw.pieslice((cx - r, cy - r, cx + r, cy + r), start, end,
+                          fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+            start = end
+    elif graph_type in ("Worm", "Run Rate", "player_playing_style"):
+        points, y = [], bottom
+        for i in range(21):
+            y = max(top, y - rng.randint(0, (bottom - top) // 15))
+            points.append((left + (right - left) * i // 20, y))
+        draw.line(points, fill=(30, 90, 200), width=4)
+    else:
+        bar = (right - left) // 25
+        for i in range(20):
+            h = rng.randint(5, bottom - top)
+            x = left + bar + i * bar * 6 // 5
+            draw.rectangle((x, bottom - h, x + bar, bottom), fill=(40, 120, 60))
+    return image
+
+
+def render_dashboard(graph_types, columns=2, panel_size=(960, 540), gutter=40, seed=0):
+    """Lay several charts out on one canvas with blank gutters between them."""
+    from PIL import Image
+
+    rows = -(-len(graph_types) // columns)
+    width, height = panel_size
+    canvas = Image.new("RGB", (columns * width + (columns + 1) * gutter, rows * height + (rows + 1) * gutter), "white")
+    for i, graph_type in enumerate(graph_types):
+        row, column = divmod(i, columns)
+        canvas.paste(render_chart(graph_type, size=panel_size, seed=seed + i),
+                     (gutter + column * (width + gutter), gutter + row * (height + gutter)))
+    return canvas
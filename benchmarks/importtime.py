@@ -0,0 +1,94 @@
+"""Cold-start import budget for the modules workers and CLIs load first.
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --runs 10 insights.registry
+
+Each entry point is imported in a fresh interpreter under
+``python -X importtime``; the best cumulative time over ``--runs`` is
+checked against its budget, and none of them may pull in a heavy
+dependency (streamlit, pytesseract/pandas, PIL) at import time. Exits
+non-zero when a budget is broken.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Milliseconds of cumulative import time. numpy alone is most of the
+# budget for anything that touches match data.
+BUDGETS_MS = {
+    "insights.rules": 30,
+    "insights.ocr": 60,
+    "insights.detect": 60,
+    "insights.stream": 200,
+    "insights.registry": 200,
+    "batch": 250,
+}
+HEAVY_MODULES = ("streamlit", "pytesseract", "pandas", "PIL")
+
+
+def import_profile(module):
+    # Returns (cumulative seconds, imported module names) for one cold import.
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True,
+    )
+    total, imported = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            total = int(cumulative) / 1e6
+    if total is None:
+        raise RuntimeError(f"{module} did not show up in -X importtime output")
+    return total, imported
+
+
+def best_import_time(module, runs=5):
+    # The first run also warms the bytecode cache, so the best run is the
+    # cold-process cost without compilation.
+    best, imported = None, set()
+    for _ in range(runs):
+        seconds, imported = import_profile(module)
+        best = seconds if best is None else min(best, seconds)
+    return best, imported
+
+
+def check(modules, runs=5):
+    failures = []
+    print(f"{'module':24s} {'best ms':>9s} {'budget':>8s}  heavy imports")
+    for module in modules:
+        seconds, imported = best_import_time(module, runs)
+        budget = BUDGETS_MS.get(module)
+        heavy = sorted(m for m in HEAVY_MODULES if m in imported)
+        over = budget is not None and seconds * 1e3 > budget
+        flag = " !" if over or heavy else ""
+        print(f"{module:24s} {seconds * 1e3:9.1f} {budget if budget else '-':>8}  {', '.join(heavy) or '-'}{flag}")
+        if flag:
+            failures.append(module)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check cold-start import time budgets.")
+    parser.add_argument("modules", nargs="*", default=list(BUDGETS_MS), help="modules to check (default: all budgeted)")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    args = parser.parse_args(argv)
+
+    failures = check(args.modules, args.runs)
+    if failures:
+        print(f"{len(failures)} module(s) over budget or importing heavy dependencies: {', '.join(failures)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""Simulate many users uploading charts to size a deployment.
+
+    python -m benchmarks.loadtest --users 8 --duration 30
+    python -m benchmarks.loadtest --rate 4 --workers 2 4 8 --executor thread process
+    python -m benchmarks.loadtest --users 16 --cache on off -o loadtest.json
+
+Uploads are synthetic chart images with their JSON, drawn from ``MIX``
+(match charts, which always need OCR, dominate; player and team exports
+name their graph in the JSON). Each one goes through explain_bytes(), the
+code path behind batch mode and the service.
+
+``--users`` keeps that many uploads in flight (closed loop). ``--rate``
+sends uploads at Poisson arrivals per second whatever the backlog (open
+loop), so latency includes time queued for a worker. Every combination
+of ``--workers``, ``--executor`` and ``--cache`` is run in turn. Each run
+reports throughput, latency percentiles, CPU use and peak memory per
+worker. CPU includes tesseract subprocesses. Thread workers share one
+process, so they are reported as one.
+
+``--cache off`` disables the result cache and the OCR cache. ``--cache
+on`` starts both empty, with results in a temporary SQLite file shared
+by the workers, so repeated uploads (see ``--distinct``) hit it as they
+would in production.
+"""
+import argparse
+import io
+import itertools
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: CPU from process_time, no peak RSS
+    resource = None
+
+from benchmarks import generators
+from benchmarks.run import _tesseract_available
+from insights.ocr_cache import DEFAULT_MAX_BYTES, OCR_CACHE
+from insights.pipeline import explain_bytes
+from insights.result_cache import ResultCache
+from insights.schema import PLAYER_KEYS
+
+
+# Relative share of uploads per graph type.
+MIX = {
+    "Manhattan": 14,
+    "Worm": 14,
+    "Run Rate": 10,
+    "Wickets Pie": 8,
+    "Partnership": 6,
+    "Types of Runs": 6,
+    "player_current_form": 8,
+    "player_wagon_wheel": 8,
+    "player_playing_style": 5,
+    "player_vs_bowling": 5,
+    "team_current_form": 8,
+    "team_toss_insights": 8,
+}
+PERCENTILES = (50, 95, 99)
+
+
+def upload_json(graph_type, seed):
+    if not graph_type.startswith(("player_", "team_")):
+        return generators.generate_match(seed=seed)
+    if graph_type == "player_vs_bowling":
+        return generators.generate_vs_bowling_payload(seed)
+    if graph_type == "team_current_form":
+        return generators.generate_team_form_payload(seed=seed)
+    if graph_type == "team_toss_insights":
+        return generators.generate_toss_payload(seed)
+    # A player export carries the one series its chart shows.
+    key = {g: k for k, g in PLAYER_KEYS.items()}[graph_type]
+    return {"data": {key: generators.generate_player_payload(seed=seed)["data"][key]}}
+
+
+def build_uploads(distinct=10, size=(1600, 900)):
+    """Synthetic uploads: ``({graph_type: [(image bytes, JSON bytes), ...]}, warm-up pair)``.
+
+    Each graph type gets ``distinct`` variants. The warm-up pair is none of
+    them, so warming workers up leaves nothing in the caches to hit.
+    """
+    def upload(graph_type, seed):
+        buffer = io.BytesIO()
+        generators.render_chart(graph_type, size=size, seed=seed).save(buffer, "PNG")
+        return buffer.getvalue(), json.dumps(upload_json(graph_type, seed)).encode()
+
+    uploads = {graph_type: [upload(graph_type, seed) for seed in range(distinct)] for graph_type in MIX}
+    return uploads, upload(next(iter(MIX)), distinct)
+
+
+def _cpu_seconds():
+    if resource is None:
+        return time.process_time()
+    own, children = resource.getrusage(resource.RUSAGE_SELF), resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 2 ** 20 if sys.platform == "darwin" else rss / 1024
+
+
+_result_cache = None
+
+
+def init_worker(cache_path):
+    # Once per worker process, or once in-process for thread workers.
+    global _result_cache
+    _result_cache = ResultCache(cache_path) if cache_path else None
+    OCR_CACHE.clear()
+    OCR_CACHE.max_bytes = DEFAULT_MAX_BYTES if cache_path else 0
+    OCR_CACHE.directory = None
+
+
+def job(image_bytes, json_bytes, use_cache=True):
+    # Wall-clock finish time, so latency can be taken against the arrival
+    # time recorded in the parent process.
+    cpu = _cpu_seconds()
+    started = time.perf_counter()
+    result = explain_bytes(image_bytes, json_bytes, cache=_result_cache if use_cache else None)
+    return {
+        "pid": os.getpid(),
+        "finished": time.time(),
+        "service_s": time.perf_counter() - started,
+        "cpu_s": _cpu_seconds() - cpu,
+        "max_rss_mb": _max_rss_mb(),
+        "error": "error" in result,
+        "detected": result.get("category", "unknown") != "unknown",
+        "cached": bool(result.get("cached")),
+    }
+
+
+def _percentiles(seconds):
+    if not len(seconds):
+        return {}
+    values = np.percentile(np.asarray(seconds) * 1000, PERCENTILES)
+    return {f"p{p}_ms": round(float(v), 2) for p, v in zip(PERCENTILES, values)}
+
+
+def run_load(uploads, warmup, executor="thread", workers=4, cache=True, users=None, rate=None,
+             duration=30.0, seed=0):
+    """Replay uploads for ``duration`` seconds against one configuration.
+
+    Closed loop with ``users`` (default: ``workers``) uploads in flight, or
+    open loop at ``rate`` uploads per second when it is given. Returns the
+    summary dict that main() prints.
+    """
+    rng = random.Random(seed)
+    graph_types, weights = list(MIX), list(MIX.values())
+    cache_dir = tempfile.mkdtemp(prefix="loadtest-") if cache else None
+    cache_path = os.path.join(cache_dir, "results.sqlite3") if cache else None
+    if executor == "process":
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(cache_path,))
+    else:
+        init_worker(cache_path)
+        pool = ThreadPoolExecutor(max_workers=workers)
+
+    sent = []
+
+    def submit(arrived):
+        graph_type = rng.choices(graph_types, weights)[0]
+        future = pool.submit(job, *rng.choice(uploads[graph_type]))
+        sent.append((future, graph_type, arrived))
+        return future
+
+    try:
+        # Start every worker (and its OCR engine) before the clock does.
+        wait([pool.submit(job, *warmup, use_cache=False) for _ in range(workers * 2)])
+
+        cpu = _cpu_seconds()
+        started = time.time()
+        deadline = started + duration
+        if rate:
+            arrival = started
+            while arrival < deadline:
+                time.sleep(max(0.0, arrival - time.time()))
+                submit(arrival)
+                arrival += rng.expovariate(rate)
+        else:
+            in_flight = {submit(time.time()) for _ in range(users or workers)}
+            while time.time() < deadline:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                in_flight |= {submit(time.time()) for _ in done if time.time() < deadline}
+        wait([future for future, _, _ in sent])
+        process_cpu = _cpu_seconds() - cpu
+    finally:
+        pool.shutdown()
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    records = [dict(future.result(), graph_type=graph_type, latency_s=future.result()["finished"] - arrived)
+               for future, graph_type, arrived in sent]
+    elapsed = max(r["finished"] for r in records) - started
+
+    if executor == "process":
+        # One job at a time per process, so per-job deltas add up exactly.
+        workers_report = []
+        for pid in sorted({r["pid"] for r in records}):
+            mine = [r for r in records if r["pid"] == pid]
+            workers_report.append(_worker_row(pid, mine, sum(r["cpu_s"] for r in mine), elapsed))
+    else:
+        workers_report = [_worker_row(os.getpid(), records, process_cpu, elapsed)]
+    cpu_total = sum(w["cpu_s"] for w in workers_report)
+
+    return {
+        "config": {"executor": executor, "workers": workers, "cache": cache, "users": None if rate else users or workers,
+                   "rate": rate, "duration_s": duration},
+        "requests": len(records),
+        "errors": sum(r["error"] for r in records),
+        "undetected": sum(not r["detected"] for r in records),
+        "cache_hits": sum(r["cached"] for r in records),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(records) / elapsed, 3) if elapsed else 0.0,
+        "latency": _percentiles([r["latency_s"] for r in records]),
+        "service": _percentiles([r["service_s"] for r in records]),
+        "cpu_s": round(cpu_total, 3),
+        "cpu_utilization": round(cpu_total / (elapsed * (os.cpu_count() or 1)), 3) if elapsed else 0.0,
+        "workers": workers_report,
+        "by_graph_type": {
+            graph_type: dict(requests=len(rows), **_percentiles([r["latency_s"] for r in rows]))
+            for graph_type in MIX
+            for rows in [[r for r in records if r["graph_type"] == graph_type]] if rows
+        },
+    }
+
+
+def _worker_row(pid, records, cpu_s, elapsed):
+    rss = [r["max_rss_mb"] for r in records if r["max_rss_mb"] is not None]
+    return {
+        "pid": pid,
+        "jobs": len(records),
+        "cpu_s": round(cpu_s, 3),
+        "cpu_busy": round(cpu_s / elapsed, 3) if elapsed else 0.0,
+        "max_rss_mb": round(max(rss), 1) if rss else None,
+    }
+
+
+def _label(config):
+    load = f"{config['rate']}/s arrivals" if config["rate"] else f"{config['users']} users"
+    return f"{config['executor']} x{config['workers']}, cache {'on' if config['cache'] else 'off'}, {load}"
+
+
+def report(result):
+    latency, service = result["latency"], result["service"]
+    print(f"[{_label(result['config'])}]")
+    print(f"  {result['requests']} requests in {result['elapsed_s']:.1f}s: {result['throughput_rps']:.2f} req/s, "
+          f"{result['errors']} errors, {result['undetected']} undetected, {result['cache_hits']} cache hits")
+    print(f"  latency  p50 {latency.get('p50_ms', 0):9.1f} ms  p95 {latency.get('p95_ms', 0):9.1f} ms  "
+          f"p99 {latency.get('p99_ms', 0):9.1f} ms")
+    print(f"  service  p50 {service.get('p50_ms', 0):9.1f} ms  p95 {service.get('p95_ms', 0):9.1f} ms  "
+          f"p99 {service.get('p99_ms', 0):9.1f} ms")
+    print(f"  cpu {result['cpu_s']:.1f}s ({result['cpu_utilization']:.0%} of {os.cpu_count()} CPUs)")
+    for w in result["workers"]:
+        rss = "-" if w["max_rss_mb"] is None else f"{w['max_rss_mb']:.1f} MB"
+        print(f"    worker {w['pid']}: {w['jobs']} jobs, cpu {w['cpu_s']:.1f}s ({w['cpu_busy']:.0%} busy), peak RSS {rss}")
+
+
+def compare(results):
+    print(f"{'configuration':44s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} {'p99 ms':>9s} {'cpu':>5s} {'max RSS MB':>11s}")
+    for r in results:
+        rss = [w["max_rss_mb"] for w in r["workers"] if w["max_rss_mb"] is not None]
+        print(f"{_label(r['config']):44s} {r['throughput_rps']:8.2f} {r['latency'].get('p50_ms', 0):9.1f} "
+              f"{r['latency'].get('p95_ms', 0):9.1f} {r['latency'].get('p99_ms', 0):9.1f} "
+              f"{r['cpu_utilization']:5.0%} {max(rss) if rss else '-':>11}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test detection and summarization with simulated users.")
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--users", type=int, help="uploads kept in flight (closed loop; default: one per worker)")
+    load.add_argument("--rate", type=float, help="Poisson arrivals per second (open loop)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load per configuration")
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1])
+    parser.add_argument("--executor", nargs="+", default=["thread"], choices=["thread", "process"])
+    parser.add_argument("--cache", nargs="+", default=["on"], choices=["on", "off"])
+    parser.add_argument("--distinct", type=int, default=10, help="different uploads per graph type")
+    parser.add_argument("--size", default="1600x900", help="chart image size, WIDTHxHEIGHT")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write all results to this JSON file")
+    args = parser.parse_args(argv)
+
+    if not _tesseract_available():
+        print("tesseract not found: match charts will come back undetected", file=sys.stderr)
+    width, height = (int(v) for v in args.size.lower().split("x"))
+    print(f"Rendering {args.distinct} uploads for each of {len(MIX)} graph types...", file=sys.stderr)
+    uploads, warmup = build_uploads(args.distinct, (width, height))
+
+    results = []
+    for executor, workers, cache in itertools.product(args.executor, args.workers, args.cache):
+        result = run_load(uploads, warmup, executor, workers, cache == "on", args.users, args.rate,
+                          args.duration, args.seed)
+        report(result)
+        results.append(result)
+    if len(results) > 1:
+        print()
+        compare(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "cpus": os.cpu_count()},
+                       "results": results}, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Time every detector and summarizer across data-size tiers.
+
+    python -m benchmarks.run -o benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+    python -m benchmarks.run --tiers t20 test season --filter _summary
+
+Each case records best/mean wall time, ops/sec and peak traced memory.
+``--compare`` prints the ratio against an earlier run and flags cases that
+got slower than ``--threshold``.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks import generators, importtime
+from insights import match_insights, player_insights, team_insights
+from insights.archive import MatchArchive
+from insights.deliveries import build_delivery_table
+from insights.ingest import ingest_image
+from insights.match_aggregates import aggregate_match
+from insights.panels import detect_panels, find_panels
+from insights.player_cube import build_player_cube
+from insights.preprocess import title_strip_image
+from insights.rules import classify_text
+from insights.snapshot import dump_snapshot, load_snapshot
+from insights.squad import load_squad
+from insights.stream import load_json_upload
+from insights.visual import VisualClassifier
+
+
+MIN_TIME = 0.25
+MAX_REPEAT = 200
+
+MATCH_SUMMARIZERS = [
+    "manhattan_summary",
+    "worm_summary",
+    "run_rate_summary",
+    "wickets_pie_summary",
+    "partnership_summary",
+    "types_of_runs_summary",
+]
+PLAYER_SUMMARIZERS = [
+    "player_current_form_summary",
+    "player_playing_style_summary",
+    "player_wagon_wheel_summary",
+    "shot_analysis_runs_summary",
+    "shot_analysis_outs_summary",
+    "batting_position_summary",
+    "player_run_types_summary",
+]
+CUBE_SUMMARIZERS = [
+    "player_wagon_wheel_summary",
+    "shot_analysis_runs_summary",
+    "shot_analysis_outs_summary",
+    "player_run_types_summary",
+]
+PLAYER_TIERS = {"player-small": 200, "player-large": 20000}
+ALL_TIERS = list(generators.MATCH_TIERS) + ["season"] + list(PLAYER_TIERS) + ["squad", "team", "detect", "import"]
+DEFAULT_TIERS = ["t20", "odi", "test", "player-small", "player-large", "team", "detect", "import"]
+
+
+def measure(fn, items=1):
+    fn()  # warm up
+    times = []
+    started = time.perf_counter()
+    while len(times) < MAX_REPEAT and (not times or time.perf_counter() - started < MIN_TIME):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        "best_s": best,
+        "mean_s": sum(times) / len(times),
+        "repeat": len(times),
+        "ops_per_s": 1 / best if best else float("inf"),
+        "items": items,
+        "items_per_s": items / best if best else float("inf"),
+        "peak_kb": peak / 1024,
+    }
+
+
+def match_cases(tier):
+    data = generators.generate_tier(tier)
+    raw = json.dumps(data).encode()
+    n = sum(len(o["deliveries"]) for inning in data["innings"] for o in inning["overs"])
+    aggregates = aggregate_match(data)
+
+    yield "build_delivery_table", lambda: build_delivery_table(data), n
+    yield "aggregate_match", lambda: aggregate_match(data), n
+    yield "json.load", lambda: json.loads(raw), n
+    yield "load_json_upload", lambda: load_json_upload(io.BytesIO(raw)), n
+    snapshot = dump_snapshot(*load_json_upload(io.BytesIO(raw)))
+    yield "load_snapshot", lambda: load_snapshot(snapshot), n
+    for name in MATCH_SUMMARIZERS:
+        summarize = getattr(match_insights, name)
+        yield name, lambda summarize=summarize: summarize(data), n
+        yield name + "[aggregates]", lambda summarize=summarize: summarize(aggregates), n
+    yield "match_report", lambda: match_insights.match_report(data), n
+
+
+def season_cases(matches=1000):
+    season = generators.generate_season(matches)
+    n = sum(len(o["deliveries"]) for m in season for inning in m["innings"] for o in inning["overs"])
+    yield "aggregate_match[season]", lambda: [aggregate_match(m) for m in season], n
+
+    table_bytes = sum(build_delivery_table(m).nbytes for m in season)
+    print(f"  delivery tables: {table_bytes / n:.1f} bytes/delivery", file=sys.stderr)
+
+    path = tempfile.mkdtemp(prefix="bench-archive-")
+    try:
+        archive = MatchArchive(path)
+        started = time.perf_counter()
+        for i, m in enumerate(season):
+            archive.add_match(m, match_id=str(i))
+        print(f"  archive build: {time.perf_counter() - started:.2f}s for {matches} matches", file=sys.stderr)
+        team = generators.TEAMS[0]
+        yield "archive.select[team]", lambda: archive.select(team=team), n
+        yield "archive.manhattan[team]", lambda: match_insights.manhattan_summary(
+            archive.select(team=team, by_team=True)), n
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def player_cases(entries):
+    data = generators.generate_player_payload(entries)["data"]
+    for name in PLAYER_SUMMARIZERS:
+        summarize = getattr(player_insights, name)
+        yield name, lambda summarize=summarize: summarize(data), entries
+    vs_bowling = generators.generate_vs_bowling_payload()["data"]
+    yield "vs_bowling_type_summary", lambda: player_insights.vs_bowling_type_summary(dict(vs_bowling)), 1
+
+    yield "build_player_cube", lambda: build_player_cube(data), entries
+    snapshot = dump_snapshot({"data": data})
+    yield "load_snapshot[player]", lambda: load_snapshot(snapshot), entries
+    cube = build_player_cube(data)
+    for name in CUBE_SUMMARIZERS:
+        summarize = getattr(player_insights, name)
+        yield f"{name}[cube]", lambda summarize=summarize: summarize(cube), entries
+    region, bowling_type = cube.regions[0], cube.bowling_types[0]
+    yield "cube.runs_for", lambda: cube.runs_for(region, bowling_type), entries
+
+
+def squad_cases(players=200, entries=100):
+    squad = {
+        f"player{i}": [generators.generate_player_payload(entries, seed=i), generators.generate_vs_bowling_payload(seed=i)]
+        for i in range(players)
+    }
+    n = players * entries
+
+    def one_by_one():
+        for form, vs_bowling in squad.values():
+            player_insights.player_current_form_summary(form["data"])
+            player_insights.vs_bowling_type_summary(dict(vs_bowling["data"]))
+            player_insights.player_run_types_summary(form["data"])
+
+    yield "summaries[per player]", one_by_one, n
+    yield "load_squad", lambda: load_squad(squad), n
+    loaded = load_squad(squad)
+    yield "squad.compare", lambda: loaded.compare(), n
+
+
+def team_cases():
+    form = generators.generate_team_form_payload(200)["data"]
+    toss = generators.generate_toss_payload()["data"]
+    yield "team_current_form_summary", lambda: team_insights.team_current_form_summary(form), 200
+    yield "team_toss_insights_summary", lambda: team_insights.team_toss_insights_summary(toss), 1
+
+
+def detect_cases():
+    text = ("manhattan - runs per over india vs australia overs 1 2 3 4 5 6 7 8 9 10 "
+            "current form score out type error bars " * 20)
+    yield "classify_text", lambda: classify_text(text), 1
+
+    image = generators.render_chart("Manhattan", size=(3840, 2160))
+    yield "title_strip_image[4k]", lambda: title_strip_image(image), 1
+
+    for fmt in ("JPEG", "PNG"):
+        buffer = io.BytesIO()
+        image.save(buffer, fmt)
+        upload = buffer.getvalue()
+        yield f"ingest_image[4k,{fmt.lower()}]", lambda upload=upload: ingest_image(upload), 1
+
+    classifier = VisualClassifier.fit(
+        (generators.render_chart(t, seed=s), "chart", t) for t in generators.CHART_TITLES for s in range(4))
+    yield "visual_predict[4k]", lambda: classifier.predict(image), 1
+
+    dashboard = generators.render_dashboard(list(generators.CHART_TITLES)[:8], columns=4)
+    yield "find_panels[8 panels]", lambda: find_panels(dashboard), 8
+
+    if _tesseract_available():
+        from insights.detect import detect_graph_from_image
+        from insights.ocr import STRIP_CONFIG, run_ocr
+        from insights.ocr_backend import BACKENDS
+
+        strips = [title_strip_image(generators.render_chart(t, seed=i))
+                  for i, t in enumerate(generators.CHART_TITLES)]
+        for name, backend_class in BACKENDS.items():
+            try:
+                backend = backend_class()
+            except (ImportError, RuntimeError) as e:
+                print(f"  {name} backend unavailable ({e}); skipping", file=sys.stderr)
+                continue
+            yield f"run_ocr[4k,{name}]", lambda backend=backend: run_ocr(image, backend=backend), 1
+            yield f"strips_one_by_one[{name}]", lambda backend=backend: [
+                backend.image_to_data(strip, STRIP_CONFIG) for strip in strips], len(strips)
+            yield f"strips_batched[{name}]", lambda backend=backend: backend.images_to_data(
+                strips, STRIP_CONFIG), len(strips)
+        yield "detect_graph_from_image[4k,cached]", lambda: detect_graph_from_image(image), 1
+        yield "detect_panels[8 panels,cached]", lambda: detect_panels(dashboard), 8
+    else:
+        print("  tesseract not found; skipping OCR cases", file=sys.stderr)
+
+
+def import_cases():
+    # Interpreter start plus a cold import: what every new worker pays
+    # before it can take a task. ``python -m benchmarks.importtime``
+    # checks the budgets.
+    for module in importtime.BUDGETS_MS:
+        yield f"import[{module}]", lambda module=module: importtime.import_profile(module), 1
+
+
+def _tesseract_available():
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def cases_for(tier):
+    if tier in generators.MATCH_TIERS:
+        return match_cases(tier)
+    if tier == "season":
+        return season_cases()
+    if tier in PLAYER_TIERS:
+        return player_cases(PLAYER_TIERS[tier])
+    if tier == "squad":
+        return squad_cases()
+    if tier == "team":
+        return team_cases()
+    if tier == "detect":
+        return detect_cases()
+    if tier == "import":
+        return import_cases()
+    raise ValueError(f"Unknown tier {tier!r}")
+
+
+def run(tiers, name_filter=None):
+    results = {}
+    for tier in tiers:
+        print(f"[{tier}]", file=sys.stderr)
+        for name, fn, items in cases_for(tier):
+            if name_filter and name_filter not in name:
+                continue
+            key = f"{tier}/{name}"
+            results[key] = measure(fn, items)
+            r = results[key]
+            print(f"  {name:42s} {r['best_s'] * 1e3:10.3f} ms  {r['ops_per_s']:10.1f} ops/s  "
+                  f"{r['peak_kb']:10.1f} KiB", file=sys.stderr)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    print(f"{'case':56s} {'base ms':>10s} {'now ms':>10s} {'ratio':>7s}")
+    for key, now in sorted(results.items()):
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:56s} {'-':>10s} {now['best_s'] * 1e3:10.3f} {'new':>7s}")
+            continue
+        ratio = now["best_s"] / base["best_s"] if base["best_s"] else float("inf")
+        flag = " !" if ratio > 1 + threshold else ""
+        print(f"{key:56s} {base['best_s'] * 1e3:10.3f} {now['best_s'] * 1e3:10.3f} {ratio:7.2f}{flag}")
+        if flag:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark detectors and summarizers.")
+    parser.add_argument("--tiers", nargs="+", default=DEFAULT_TIERS, choices=ALL_TIERS)
+    parser.add_argument("--filter", help="only run cases whose name contains this string")
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed slowdown before flagging (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    results = run(args.tiers, args.filter)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpus": os.cpu_count(),
+                },
+                "results": results,
+            }, f, indent=2)
+        print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} case(s) slower than baseline by more than {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
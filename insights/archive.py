@@ -0,0 +1,314 @@
+"""On-disk, memory-mapped archive of match deliveries for season insights.
+
+    python -m insights.archive add season/ matches/*.json
+
+Columns are raw little-endian arrays appended to ``<archive>/*.bin`` and
+read back with ``np.memmap``. ``index.json`` holds the codebooks (players,
+teams, wicket kinds), one entry per match and the team/player/date
+lookups. Filtered slices come back as DeliveryTables, so every summary in
+``insights.match_insights`` runs on them unchanged.
+"""
+import json
+import os
+import sys
+import tempfile
+
+import numpy as np
+
+from insights.deliveries import DeliveryTable, DeliveryTableBuilder, interned
+from insights.stream import MatchStream
+
+
+DELIVERY_COLUMNS = {
+    "innings": np.int32,
+    "over": np.int32,
+    "ball": np.int32,
+    "runs_total": np.int32,
+    "runs_batter": np.int32,
+    "runs_extras": np.int32,
+    "batter": np.int32,
+    "non_striker": np.int32,
+}
+WICKET_COLUMNS = {
+    "wicket_row": np.int64,
+    "wicket_kind": np.int32,
+}
+INNINGS_COLUMNS = {
+    "innings_team": np.int32,
+    "innings_overs": np.int64,
+    "innings_match": np.int32,
+    "innings_row_start": np.int64,
+    "innings_rows": np.int64,
+    "innings_wicket_start": np.int64,
+    "innings_wickets": np.int64,
+}
+ALL_COLUMNS = {**DELIVERY_COLUMNS, **WICKET_COLUMNS, **INNINGS_COLUMNS}
+
+
+def _empty_index():
+    return {
+        "version": 1,
+        "rows": 0,
+        "wickets": 0,
+        "innings": 0,
+        "players": [],
+        "teams": [],
+        "wicket_kinds": [],
+        "matches": [],
+        "team_innings": {},
+        "player_innings": {},
+    }
+
+
+class MatchArchive:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        index_path = os.path.join(path, "index.json")
+        if os.path.exists(index_path):
+            with open(index_path, encoding="utf-8") as f:
+                self.index = json.load(f)
+        else:
+            self.index = _empty_index()
+        self._truncate_to_index()
+
+    def __len__(self):
+        return len(self.index["matches"])
+
+    def __repr__(self):
+        return f"MatchArchive({self.path!r}, {len(self)} matches, {self.index['rows']} deliveries)"
+
+    # -- writing -----------------------------------------------------------
+
+    def _column_path(self, name):
+        return os.path.join(self.path, name + ".bin")
+
+    def _column_length(self, name):
+        if name in DELIVERY_COLUMNS:
+            return self.index["rows"]
+        if name in WICKET_COLUMNS:
+            return self.index["wickets"]
+        return self.index["innings"]
+
+    def _truncate_to_index(self):
+        # An append that died before index.json was rewritten leaves extra
+        # bytes at the end of the column files; the index is the source of
+        # truth, so cut them off.
+        for name, dtype in ALL_COLUMNS.items():
+            path = self._column_path(name)
+            size = self._column_length(name) * np.dtype(dtype).itemsize
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+
+    def _append(self, name, values):
+        with open(self._column_path(name), "ab") as f:
+            f.write(np.ascontiguousarray(values, dtype=np.dtype(ALL_COLUMNS[name]).newbyteorder("<")).tobytes())
+
+    def _write_index(self):
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.index, f)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    def add_match(self, source, match_id=None, date=None):
+        """Append one match from a JSON path, file object or dict."""
+        self._truncate_to_index()
+        index = self.index
+        players = {name: code for code, name in enumerate(index["players"])}
+        kinds = {name: code for code, name in enumerate(index["wicket_kinds"])}
+        builder = DeliveryTableBuilder(players, kinds)
+
+        if isinstance(source, dict):
+            document = source
+            for i, inning in enumerate(source["innings"]):
+                builder.set_innings(i, inning["team"], len(inning["overs"]))
+                for o, over_data in enumerate(inning["overs"]):
+                    for b, delivery in enumerate(over_data["deliveries"]):
+                        builder.add(i, o, b, delivery)
+        else:
+            fp = open(source, "rb") if isinstance(source, (str, os.PathLike)) else source
+            try:
+                stream = MatchStream(fp)
+                for i, o, b, delivery in stream:
+                    builder.add(i, o, b, delivery)
+                for i, team in enumerate(stream.innings_teams):
+                    builder.set_innings(i, team, stream.innings_overs[i])
+                document = stream.document
+            finally:
+                if fp is not source:
+                    fp.close()
+            if match_id is None and isinstance(source, (str, os.PathLike)):
+                match_id = os.path.splitext(os.path.basename(source))[0]
+
+        table = builder.build()
+        if match_id is None:
+            match_id = str(len(index["matches"]))
+        if any(m["match_id"] == match_id for m in index["matches"]):
+            raise ValueError(f"Match {match_id!r} is already in the archive")
+        if date is None:
+            dates = document.get("info", {}).get("dates") or [None]
+            date = dates[0]
+
+        teams = {name: code for code, name in enumerate(index["teams"])}
+        first_innings = index["innings"]
+        n_innings = len(table.innings_teams)
+
+        # Per-innings extents; rows of an innings are contiguous because the
+        # source lists deliveries innings by innings.
+        rows_per_innings = np.bincount(table.innings, minlength=n_innings)
+        wickets_per_innings = np.bincount(table.innings[table.wicket_row], minlength=n_innings)
+        row_start = index["rows"] + np.cumsum(rows_per_innings) - rows_per_innings
+        wicket_start = index["wickets"] + np.cumsum(wickets_per_innings) - wickets_per_innings
+
+        self._append("innings", table.innings.astype(np.int64) + first_innings)
+        for name in ("over", "ball", "runs_total", "runs_batter", "runs_extras", "batter", "non_striker"):
+            self._append(name, getattr(table, name))
+        self._append("wicket_row", table.wicket_row.astype(np.int64) + index["rows"])
+        self._append("wicket_kind", table.wicket_kind)
+        self._append("innings_team", [interned(teams, team) for team in table.innings_teams])
+        self._append("innings_overs", table.innings_overs)
+        self._append("innings_match", np.full(n_innings, len(index["matches"])))
+        self._append("innings_row_start", row_start)
+        self._append("innings_rows", rows_per_innings)
+        self._append("innings_wicket_start", wicket_start)
+        self._append("innings_wickets", wickets_per_innings)
+
+        for i, team in enumerate(table.innings_teams):
+            index["team_innings"].setdefault(team, []).append(first_innings + i)
+        for i in range(n_innings):
+            in_innings = table.innings == i
+            codes = np.union1d(table.batter[in_innings], table.non_striker[in_innings])
+            for code in codes.tolist():
+                index["player_innings"].setdefault(table.players[code], []).append(first_innings + i)
+
+        index["matches"].append({
+            "match_id": match_id,
+            "date": date,
+            "teams": list(dict.fromkeys(table.innings_teams)),
+            "first_innings": first_innings,
+            "innings": n_innings,
+        })
+        index["players"] = list(players)
+        index["wicket_kinds"] = list(kinds)
+        index["teams"] = list(teams)
+        index["rows"] += len(table)
+        index["wickets"] += len(table.wicket_row)
+        index["innings"] += n_innings
+        self._write_index()
+        return match_id
+
+    # -- reading -----------------------------------------------------------
+
+    def column(self, name):
+        length = self._column_length(name)
+        dtype = np.dtype(ALL_COLUMNS[name]).newbyteorder("<")
+        if length == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self._column_path(name), dtype=dtype, mode="r", shape=(length,))
+
+    def find_innings(self, match_ids=None, team=None, player=None, date_from=None, date_to=None):
+        """Global innings ids matching every given filter."""
+        index = self.index
+        selected = set(range(index["innings"]))
+        if match_ids is not None:
+            wanted = set(match_ids)
+            selected &= {
+                m["first_innings"] + i
+                for m in index["matches"] if m["match_id"] in wanted
+                for i in range(m["innings"])
+            }
+        if date_from is not None or date_to is not None:
+            selected &= {
+                m["first_innings"] + i
+                for m in index["matches"]
+                if m["date"] is not None
+                and (date_from is None or m["date"] >= date_from)
+                and (date_to is None or m["date"] <= date_to)
+                for i in range(m["innings"])
+            }
+        if team is not None:
+            selected &= set(index["team_innings"].get(team, ()))
+        if player is not None:
+            selected &= set(index["player_innings"].get(player, ()))
+        return sorted(selected)
+
+    def select(self, by_team=False, **filters):
+        """Return the filtered deliveries as a DeliveryTable.
+
+        With ``by_team=True`` every innings of the same batting team is
+        folded into one, so e.g. the Manhattan shows a team's runs per over
+        position summed across the whole slice.
+        """
+        innings_ids = np.array(self.find_innings(**filters), dtype=np.int64)
+        row_start = self.column("innings_row_start")[innings_ids]
+        rows = self.column("innings_rows")[innings_ids]
+        wicket_start = self.column("innings_wicket_start")[innings_ids]
+        wickets = self.column("innings_wickets")[innings_ids]
+
+        row_index = _ranges(row_start, rows)
+        wicket_index = _ranges(wicket_start, wickets)
+
+        # Local row numbers: each selected innings' rows follow the previous.
+        local_start = np.cumsum(rows) - rows
+        wicket_innings = np.repeat(np.arange(len(innings_ids)), wickets)
+        wicket_row = (self.column("wicket_row")[wicket_index]
+                      - row_start[wicket_innings] + local_start[wicket_innings])
+
+        team_codes = self.column("innings_team")[innings_ids]
+        innings_overs = np.asarray(self.column("innings_overs")[innings_ids], dtype=np.int64)
+        local_innings = np.repeat(np.arange(len(innings_ids)), rows)
+        innings_teams = [self.index["teams"][code] for code in team_codes.tolist()]
+
+        if by_team:
+            groups = list(dict.fromkeys(innings_teams))
+            group_of = np.array([groups.index(team) for team in innings_teams], dtype=np.int64)
+            local_innings = group_of[local_innings]
+            group_overs = np.zeros(len(groups), dtype=np.int64)
+            np.maximum.at(group_overs, group_of, innings_overs)
+            innings_teams, innings_overs = groups, group_overs
+
+        return DeliveryTable(
+            innings=local_innings.astype(np.int32),
+            over=np.asarray(self.column("over")[row_index]),
+            ball=np.asarray(self.column("ball")[row_index]),
+            runs_total=np.asarray(self.column("runs_total")[row_index]),
+            runs_batter=np.asarray(self.column("runs_batter")[row_index]),
+            runs_extras=np.asarray(self.column("runs_extras")[row_index]),
+            batter=np.asarray(self.column("batter")[row_index]),
+            non_striker=np.asarray(self.column("non_striker")[row_index]),
+            wicket_row=wicket_row.astype(np.int64),
+            wicket_kind=np.asarray(self.column("wicket_kind")[wicket_index]),
+            innings_teams=innings_teams,
+            innings_overs=innings_overs,
+            players=list(self.index["players"]),
+            wicket_kinds=list(self.index["wicket_kinds"]),
+        )
+
+
+def _ranges(starts, lengths):
+    # Concatenated aranges [start, start + length) without a Python loop.
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.repeat(starts - offsets, lengths) + np.arange(total)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3 or argv[0] != "add":
+        print("usage: python -m insights.archive add ARCHIVE_DIR MATCH.json [...]", file=sys.stderr)
+        return 2
+    archive = MatchArchive(argv[1])
+    for path in argv[2:]:
+        try:
+            print("added", archive.add_match(path))
+        except (OSError, ValueError, KeyError) as e:
+            print(f"skipped {path}: {e}", file=sys.stderr)
+    print(archive)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,156 @@
+import numpy as np
+
+
+class DeliveryTable:
+    """Columnar, NumPy-backed view of every delivery in a match.
+
+    One row per delivery. ``innings`` indexes ``innings_teams`` and
+    ``innings_overs``; ``over`` and ``ball`` are positions within the innings
+    and the over. ``batter`` and ``non_striker`` are codes into ``players``.
+    Wickets get their own rows (``wicket_row`` points at the delivery,
+    ``wicket_kind`` is a code into ``wicket_kinds``) because a delivery can
+    carry more than one.
+
+    Built tables store each column in the narrowest integer type its values
+    fit (see ``compact``): about 8 bytes per delivery for a T20 match,
+    so arithmetic on a column should widen it first.
+    """
+
+    def __init__(self, innings, over, ball, runs_total, runs_batter, runs_extras,
+                 batter, non_striker, wicket_row, wicket_kind,
+                 innings_teams, innings_overs, players, wicket_kinds):
+        self.innings = innings
+        self.over = over
+        self.ball = ball
+        self.runs_total = runs_total
+        self.runs_batter = runs_batter
+        self.runs_extras = runs_extras
+        self.batter = batter
+        self.non_striker = non_striker
+        self.wicket_row = wicket_row
+        self.wicket_kind = wicket_kind
+        self.innings_teams = innings_teams
+        self.innings_overs = innings_overs
+        self.players = players
+        self.wicket_kinds = wicket_kinds
+
+    def __len__(self):
+        return len(self.runs_total)
+
+    def __repr__(self):
+        return (f"DeliveryTable({len(self)} deliveries, {len(self.innings_teams)} innings, "
+                f"{len(self.players)} players)")
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def over_start(self):
+        # Index of each innings' first over in the flattened over axis.
+        return np.cumsum(self.innings_overs) - self.innings_overs
+
+    def over_totals(self):
+        # Runs per over for every innings, empty overs included, as one list
+        # of arrays in innings order.
+        starts = self.over_start()
+        global_over = starts[self.innings] + self.over
+        totals = np.bincount(global_over, weights=self.runs_total,
+                             minlength=int(self.innings_overs.sum())).astype(np.int64)
+        return np.split(totals, starts[1:])
+
+
+COLUMNS = ("innings", "over", "ball", "runs_total", "runs_batter", "runs_extras",
+           "batter", "non_striker", "wicket_row", "wicket_kind")
+
+
+def compact(values):
+    # Integer array in the narrowest dtype that holds every value: uint8
+    # for runs, balls and a match's player codes, uint16 for overs.
+    array = np.asarray(values, dtype=np.int64)
+    if not len(array):
+        return array.astype(np.uint8)
+    low, high = int(array.min()), int(array.max())
+    if low >= 0:
+        return array.astype(np.min_scalar_type(high))
+    return array.astype(np.result_type(np.min_scalar_type(low), np.min_scalar_type(-high - 1)))
+
+
+def interned(codes, value):
+    code = codes.get(value)
+    if code is None:
+        code = codes[value] = len(codes)
+    return code
+
+
+class DeliveryTableBuilder:
+    """Accumulates deliveries row by row and freezes them into a table.
+
+    ``players`` and ``wicket_kinds`` can be shared between builders so
+    codes stay stable across chunks of the same stream.
+    """
+
+    def __init__(self, players=None, wicket_kinds=None):
+        self.players = {} if players is None else players
+        self.wicket_kinds = {} if wicket_kinds is None else wicket_kinds
+        self.innings_teams = []
+        self.innings_overs = []
+        self._columns = {name: [] for name in COLUMNS}
+
+    def __len__(self):
+        return len(self._columns["innings"])
+
+    def set_innings(self, innings, team, overs):
+        while len(self.innings_teams) <= innings:
+            self.innings_teams.append(None)
+            self.innings_overs.append(0)
+        self.innings_teams[innings] = team
+        self.innings_overs[innings] = max(self.innings_overs[innings], overs)
+
+    def add(self, innings, over, ball, delivery):
+        c = self._columns
+        runs = delivery["runs"]
+        row = len(c["innings"])
+        c["innings"].append(innings)
+        c["over"].append(over)
+        c["ball"].append(ball)
+        c["runs_total"].append(runs["total"])
+        c["runs_batter"].append(runs.get("batter", 0))
+        c["runs_extras"].append(runs.get("extras", 0))
+        c["batter"].append(interned(self.players, delivery["batter"]))
+        c["non_striker"].append(interned(self.players, delivery["non_striker"]))
+        for w in delivery.get("wickets", ()):
+            c["wicket_row"].append(row)
+            c["wicket_kind"].append(interned(self.wicket_kinds, w["kind"]))
+
+    def build(self):
+        c = self._columns
+        return DeliveryTable(
+            **{name: compact(c[name]) for name in COLUMNS},
+            innings_teams=list(self.innings_teams),
+            innings_overs=np.array(self.innings_overs, dtype=np.int64),
+            players=list(self.players),
+            wicket_kinds=list(self.wicket_kinds),
+        )
+
+
+def build_delivery_table(match_data):
+    builder = DeliveryTableBuilder()
+    for i, inning in enumerate(match_data["innings"]):
+        builder.set_innings(i, inning["team"], len(inning["overs"]))
+        for o, over_data in enumerate(inning["overs"]):
+            for b, delivery in enumerate(over_data["deliveries"]):
+                builder.add(i, o, b, delivery)
+    return builder.build()
+
+
+def as_delivery_table(match_data):
+    if isinstance(match_data, DeliveryTable):
+        return match_data
+    return build_delivery_table(match_data)
+
+
+def first_seen_order(codes):
+    # Distinct codes in order of first appearance, which is the order the
+    # dict-based summaries used to report them in.
+    unique, first = np.unique(codes, return_index=True)
+    return unique[np.argsort(first, kind="stable")]
@@ -0,0 +1,107 @@
+import threading
+
+from insights.metrics import stage
+from insights.ocr import detect_many_with_title_strips, detect_with_title_strips
+from insights.rules import classify_text
+from insights.schema import detect_graph_from_json
+
+
+_counts_lock = threading.Lock()
+_counts = {"schema": 0, "visual": 0, "ocr": 0}
+
+
+def _count(source):
+    with _counts_lock:
+        _counts[source] += 1
+
+
+def detect_graph_category_from_text(text):
+    result = classify_text(text)
+    return result.category if result else "unknown"
+
+
+def detect_graph_from_text(text):
+    # One scan of the rule table gives both the category and the graph type.
+    result = classify_text(text)
+    if result is None:
+        return "unknown", None
+    return result.category, result.graph_type
+
+
+def _detect_known_graph(text):
+    category, graph_type = detect_graph_from_text(text)
+    if category == "unknown" or graph_type is None:
+        return None
+    return category, graph_type
+
+
+def detect_graph_from_document(document):
+    # OCR-free fast path: returns (category, graph_type) when the uploaded
+    # JSON alone names the graph, otherwise None.
+    with stage("detect", source="schema"):
+        found = detect_graph_from_json(document)
+    if found is not None:
+        _count("schema")
+    return found
+
+
+def detect_graph_source_from_image(image):
+    # The visual classifier answers first when it is confident; otherwise
+    # one OCR pass (title strips, then the full image only if they had no
+    # keyword) feeds both the category and the graph type checks. Returns
+    # (category, graph_type, source), source being "visual" or "ocr".
+    from insights.visual import predict_graph
+
+    with stage("detect", source="visual"):
+        found = predict_graph(image)
+    if found is not None:
+        _count("visual")
+        return (*found, "visual")
+
+    _count("ocr")
+    try:
+        with stage("detect", source="ocr"):
+            return (*(detect_with_title_strips(image, _detect_known_graph) or ("unknown", None)), "ocr")
+    except Exception as e:
+        print("Graph detection failed:", e)
+
+    return "unknown", None, "ocr"
+
+
+def detect_graph_from_image(image):
+    category, graph_type, _ = detect_graph_source_from_image(image)
+    return category, graph_type
+
+
+def detect_graphs_from_images(images):
+    # detect_graph_source_from_image() for several images, such as the
+    # panels of a dashboard: the images the visual classifier cannot place
+    # are OCR'd together, one backend batch per pass.
+    from insights.visual import predict_graph
+
+    results = [None] * len(images)
+    with stage("detect", source="visual"):
+        for i, image in enumerate(images):
+            found = predict_graph(image)
+            if found is not None:
+                _count("visual")
+                results[i] = (*found, "visual")
+
+    pending = [i for i, result in enumerate(results) if result is None]
+    for _ in pending:
+        _count("ocr")
+    if pending:
+        try:
+            with stage("detect", source="ocr"):
+                found = detect_many_with_title_strips([images[i] for i in pending], _detect_known_graph)
+            for i, graph in zip(pending, found):
+                results[i] = (*(graph or ("unknown", None)), "ocr")
+        except Exception as e:
+            print("Graph detection failed:", e)
+    return [result or ("unknown", None, "ocr") for result in results]
+
+
+def detection_stats():
+    with _counts_lock:
+        total = sum(_counts.values())
+        return dict(_counts, fast_path_rate=(total - _counts["ocr"]) / total if total else 0.0)
@@ -0,0 +1,74 @@
+"""Decode uploaded images within a memory budget.
+
+Phone photos and 8K exports decode to hundreds of megabytes, while the
+detectors never need more than a couple of thousand pixels across
+(title strips are cut down to 1600, panels found at 800, the visual
+classifier works on 64x64). Uploads are checked against a byte and a
+pixel budget before any pixel is decoded. JPEGs are then decoded in
+draft mode at the smallest DCT scale that still covers the target size,
+and anything still larger is reduced once. The one image that comes back
+is what gets displayed and what OCR reads.
+
+    INGEST_MAX_BYTES   larger uploads are rejected (default: 20 MiB)
+    INGEST_MAX_PIXELS  larger images are rejected unread (default: 50 MP)
+    INGEST_MAX_SIDE    longer sides are scaled down to this (default: 2048)
+"""
+import io
+import os
+
+from insights.metrics import timed
+
+
+MAX_BYTES = int(os.environ.get("INGEST_MAX_BYTES", 20 * 1024 * 1024))
+MAX_PIXELS = int(os.environ.get("INGEST_MAX_PIXELS", 50_000_000))
+MAX_SIDE = int(os.environ.get("INGEST_MAX_SIDE", 2048))
+
+
+def _read(source, max_bytes):
+    # Reads one byte past the budget, so an oversized stream is caught
+    # without reading all of it.
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return f.read(max_bytes + 1)
+    return source.read(max_bytes + 1)
+
+
+def target_size(size, max_side=MAX_SIDE):
+    width, height = size
+    scale = min(1.0, max_side / max(width, height, 1))
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+@timed("image_decode")
+def ingest_image(source, max_side=MAX_SIDE, max_pixels=MAX_PIXELS, max_bytes=MAX_BYTES):
+    """Decode an upload (bytes, path or binary file) into a loaded PIL image.
+
+    Raises ValueError for uploads over the byte or pixel budget and for
+    data PIL cannot read. The image has its EXIF rotation applied and its
+    longer side at most ``max_side``.
+    """
+    from PIL import Image, ImageOps
+
+    data = _read(source, max_bytes)
+    if len(data) > max_bytes:
+        raise ValueError(f"Image is over the {max_bytes / 2 ** 20:.3g} MB upload limit.")
+    try:
+        # Opening only reads the header, so the size is known before decoding.
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        if width * height > max_pixels:
+            raise ValueError(f"Image is {width}x{height}, over the {max_pixels / 1e6:.0f} megapixel limit.")
+        # A no-op for anything but JPEG, which decodes at 1/2, 1/4 or 1/8 scale.
+        image.draft("RGB", target_size(image.size, max_side))
+        image.load()
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ValueError(f"Could not read the image: {e}") from e
+
+    ImageOps.exif_transpose(image, in_place=True)
+    if max(image.size) > max_side:
+        # A box reduce by the whole factor first, then a short bilinear step:
+        # plenty for OCR and about three times faster than one resize.
+        image = image.resize(target_size(image.size, max_side), Image.BILINEAR, reducing_gap=1.0)
+    return image
@@ -0,0 +1,132 @@
+import numpy as np
+
+from insights.deliveries import DeliveryTable, as_delivery_table, first_seen_order
+
+
+class MatchAggregates:
+    """Every accumulator the match summaries need, filled in one pass.
+
+    ``over_runs`` holds runs per over for each innings, ``run_types`` counts
+    batter runs of 0-6 per innings (one row per innings), and
+    ``wicket_counts``/``partnerships`` are dicts in first-seen order so
+    ties resolve the same way the original dict walks did.
+    """
+
+    def __init__(self, innings_teams, over_runs, run_types, wicket_counts, partnerships):
+        self.innings_teams = innings_teams
+        self.over_runs = over_runs
+        self.run_types = run_types
+        self.wicket_counts = wicket_counts
+        self.partnerships = partnerships
+
+    def __repr__(self):
+        return (f"MatchAggregates({len(self.innings_teams)} innings, "
+                f"{sum(self.wicket_counts.values())} wickets, {len(self.partnerships)} partnerships)")
+
+    def runs_by_over(self):
+        # Team -> runs per over. As in the original walk, a team's later
+        # innings replaces its earlier one.
+        return dict(zip(self.innings_teams, self.over_runs))
+
+    def cumulative_runs(self):
+        return {team: np.cumsum(overs) for team, overs in self.runs_by_over().items()}
+
+    def run_rates(self):
+        # Per over, so plain Python rounding is cheap and matches the
+        # figures the summaries have always shown.
+        return {
+            team: [round(total / (i + 1), 2) for i, total in enumerate(np.cumsum(overs).tolist())]
+            for team, overs in self.runs_by_over().items()
+        }
+
+    def run_types_by_team(self):
+        return dict(zip(self.innings_teams, self.run_types))
+
+    def merge(self, other):
+        # Combine aggregates from two slices of deliveries (e.g. consecutive
+        # chunks of a stream). Innings line up by index; counts add up and
+        # keys keep their first-seen order.
+        n_innings = max(len(self.innings_teams), len(other.innings_teams))
+        teams, over_runs = [], []
+        run_types = np.zeros((n_innings, 7), dtype=np.int64)
+        for i in range(n_innings):
+            mine = self.innings_teams[i] if i < len(self.innings_teams) else None
+            theirs = other.innings_teams[i] if i < len(other.innings_teams) else None
+            teams.append(theirs if mine is None else mine)
+            over_runs.append(_add_padded(
+                self.over_runs[i] if i < len(self.over_runs) else None,
+                other.over_runs[i] if i < len(other.over_runs) else None,
+            ))
+        run_types[:len(self.run_types)] += self.run_types
+        run_types[:len(other.run_types)] += other.run_types
+
+        wicket_counts = dict(self.wicket_counts)
+        for kind, count in other.wicket_counts.items():
+            wicket_counts[kind] = wicket_counts.get(kind, 0) + count
+        partnerships = dict(self.partnerships)
+        for pair, runs in other.partnerships.items():
+            partnerships[pair] = partnerships.get(pair, 0) + runs
+
+        return MatchAggregates(teams, over_runs, run_types, wicket_counts, partnerships)
+
+    def top_partnerships(self, n=3):
+        # sorted() is stable, so equal stands stay in first-seen order.
+        return sorted(self.partnerships.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def _add_padded(a, b):
+    if a is None:
+        return np.zeros(0, dtype=np.int64) if b is None else b
+    if b is None:
+        return a
+    out = np.zeros(max(len(a), len(b)), dtype=np.int64)
+    out[:len(a)] += a
+    out[:len(b)] += b
+    return out
+
+
+def empty_aggregates():
+    return MatchAggregates([], [], np.zeros((0, 7), dtype=np.int64), {}, {})
+
+
+def aggregate_table(table):
+    over_runs = table.over_totals()
+
+    # Batter runs 0-6 per innings in one bincount over innings * 7 + runs.
+    scored = (table.runs_batter >= 0) & (table.runs_batter <= 6)
+    cells = table.innings[scored].astype(np.int64) * 7 + table.runs_batter[scored]
+    run_types = np.bincount(cells, minlength=len(table.innings_teams) * 7).reshape(-1, 7)
+
+    kind_counts = np.bincount(table.wicket_kind, minlength=len(table.wicket_kinds))
+    wicket_counts = {
+        table.wicket_kinds[k]: int(kind_counts[k]) for k in first_seen_order(table.wicket_kind)
+    }
+
+    # Encode each unordered (batter, non-striker) pair as one integer and sum
+    # runs per pair.
+    n_players = len(table.players)
+    low = np.minimum(table.batter, table.non_striker).astype(np.int64)
+    high = np.maximum(table.batter, table.non_striker).astype(np.int64)
+    pair_keys, first, inverse = np.unique(low * n_players + high, return_index=True, return_inverse=True)
+    pair_runs = np.bincount(inverse.ravel(), weights=table.runs_total, minlength=len(pair_keys)).astype(np.int64)
+    partnerships = {}
+    for i in np.argsort(first, kind="stable"):
+        a, b = divmod(int(pair_keys[i]), n_players)
+        pair = tuple(sorted([table.players[a], table.players[b]]))
+        partnerships[pair] = partnerships.get(pair, 0) + int(pair_runs[i])
+
+    return MatchAggregates(list(table.innings_teams), over_runs, run_types, wicket_counts, partnerships)
+
+
+def aggregate_match(match_data):
+    # Raw JSON is walked exactly once (to build the table); every summary
+    # is then read off the same aggregates.
+    return aggregate_table(as_delivery_table(match_data))
+
+
+def as_match_aggregates(match_data):
+    if isinstance(match_data, MatchAggregates):
+        return match_data
+    if isinstance(match_data, DeliveryTable):
+        return aggregate_table(match_data)
+    return aggregate_match(match_data)
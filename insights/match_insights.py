@@ -1,47 +1,42 @@
-import pytesseract
-from collections import defaultdict
-import streamlit as st
+import numpy as np
+
+from insights.match_aggregates import as_match_aggregates
+from insights.ocr import detect_with_title_strips
+from insights.render import render_summary, streamlit_adapter
+from insights.rules import classify_text
+from insights.summary import SummaryResult
+
+
+def detect_match_graph_type_from_text(text):
+    result = classify_text(text, category="match")
+    return result.graph_type if result else None
 
 
 def detect_match_graph_type_from_image(image):
-    try:
-        text = pytesseract.image_to_string(image).lower()
-        text = text.replace("\n", " ").replace("\t", " ").strip()
-
-        if any(kw in text for kw in ["run rate", "runrate", "rr", "rpo"]):
-            return "Run Rate"
-        elif any(kw in text for kw in ["manhattan", "runs per over", "run distribution", "per over runs"]):
-            return "Manhattan"
-        elif any(kw in text for kw in ["worm", "cumulative runs", "cumulative", "score progress"]):
-            return "Worm"
-        elif any(kw in text for kw in ["wickets pie", "dismissals", "dismissal type", "fall of wicket"]):
-            return "Wickets Pie"
-        elif "partnership" in text:
-            return "Partnership"
-        elif any(kw in text for kw in ["type of runs"]):  # match only
-            return "Types of Runs"
+    from insights.visual import predict_graph
 
+    found = predict_graph(image, category="match")
+    if found is not None:
+        return found[1]
+    try:
+        return detect_with_title_strips(image, detect_match_graph_type_from_text)
     except Exception as e:
         print("OCR failed:", e)
 
     return None
 
 
-def summarize_manhattan(match_data):
-    team_overs = {}
-    for inning in match_data["innings"]:
-        team = inning["team"]
-        runs_by_over = []
-        for over in inning["overs"]:
-            total_runs = sum(delivery["runs"]["total"] for delivery in over["deliveries"])
-            runs_by_over.append(total_runs)
-        team_overs[team] = runs_by_over
+def manhattan_summary(match_data):
+    result = SummaryResult("Manhattan")
+    team_overs = as_match_aggregates(match_data).runs_by_over()
+    result.stats["runs_by_over"] = {team: overs.tolist() for team, overs in team_overs.items()}
 
     summary_parts = []
     for team, overs in team_overs.items():
-        high_overs = [i + 1 for i, r in enumerate(overs) if r >= 15]
-        low_overs = [i + 1 for i, r in enumerate(overs) if r <= 5]
-        top_over = max(enumerate(overs, start=1), key=lambda x: x[1])
+        high_overs = (np.flatnonzero(overs >= 15) + 1).tolist()
+        low_overs = (np.flatnonzero(overs <= 5) + 1).tolist()
+        top_index = int(np.argmax(overs))
+        top_over = (top_index + 1, int(overs[top_index]))
 
         sentence = f"**{team}** had their highest scoring over in the {top_over[0]}th, smashing {top_over[1]} runs. "
         if high_overs:
@@ -55,53 +50,41 @@ def summarize_manhattan(match_data):
         team2_summary = summary_parts[1]
         team2_summary = team2_summary[0].lower() + team2_summary[1:]
         combined_summary = f"{team1_summary}, Whereas {team2_summary}"
-        st.success(combined_summary)
+        result.success(combined_summary)
     else:
         for s in summary_parts:
-            st.success(s)
+            result.success(s)
+    return result
 
 
-def summarize_worm(match_data):
-    worm_data = {}
-    for inning in match_data["innings"]:
-        team = inning["team"]
-        cumulative_runs = []
-        total = 0
-        for over in inning["overs"]:
-            over_runs = sum(delivery["runs"]["total"] for delivery in over["deliveries"])
-            total += over_runs
-            cumulative_runs.append(total)
-        worm_data[team] = cumulative_runs
+def worm_summary(match_data):
+    result = SummaryResult("Worm")
+    worm_data = as_match_aggregates(match_data).cumulative_runs()
+    result.stats["cumulative_runs"] = {team: runs.tolist() for team, runs in worm_data.items()}
 
     team_names = list(worm_data.keys())
     if len(team_names) == 2:
         team1, team2 = team_names
         team1_runs = worm_data[team1]
         team2_runs = worm_data[team2]
-        turning_point = next((i+1 for i, (r1, r2) in enumerate(zip(team1_runs, team2_runs)) if r1 - r2 > 10), None)
+        common = min(len(team1_runs), len(team2_runs))
+        ahead = np.flatnonzero(team1_runs[:common] - team2_runs[:common] > 10)
+        turning_point = int(ahead[0]) + 1 if len(ahead) else None
         winner = team1 if team1_runs[-1] > team2_runs[-1] else team2
         summary = f"{team1} and {team2} were neck and neck for most of the innings. "
         if turning_point:
             summary += f"{winner} pulled ahead noticeably after over {turning_point}. "
         summary += f"{winner} maintained their lead and finished stronger."
-        st.success(summary)
+        result.success(summary)
     else:
-        st.warning("Expected two teams in the data.")
-
-
-def summarize_run_rate(match_data):
-    run_rate_data = {}
-    for inning in match_data["innings"]:
-        team = inning["team"]
-        cumulative_runs = 0
-        run_rates = []
-        for i, over in enumerate(inning["overs"]):
-            over_runs = sum(delivery["runs"]["total"] for delivery in over["deliveries"])
-            cumulative_runs += over_runs
-            current_over = i + 1
-            rr = round(cumulative_runs / current_over, 2)
-            run_rates.append(rr)
-        run_rate_data[team] = run_rates
+        result.warning("Expected two teams in the data.")
+    return result
+
+
+def run_rate_summary(match_data):
+    result = SummaryResult("Run Rate")
+    run_rate_data = as_match_aggregates(match_data).run_rates()
+    result.stats["run_rates"] = run_rate_data
 
     summary_parts = []
     for team, rates in run_rate_data.items():
@@ -121,18 +104,14 @@ def summarize_run_rate(match_data):
         team2_summary = summary_parts[1]
         team2_summary = team2_summary[0].lower() + team2_summary[1:]
         combined_summary = f"{team1_summary}, and {team2_summary}"
-        st.success(combined_summary)
+        result.success(combined_summary)
+    return result
 
 
-def summarize_wickets_pie(match_data):
-    wicket_data = {}
-    for inning in match_data["innings"]:
-        for over in inning["overs"]:
-            for delivery in over["deliveries"]:
-                if "wickets" in delivery:
-                    for w in delivery["wickets"]:
-                        kind = w["kind"]
-                        wicket_data[kind] = wicket_data.get(kind, 0) + 1
+def wickets_pie_summary(match_data):
+    result = SummaryResult("Wickets Pie")
+    wicket_data = as_match_aggregates(match_data).wicket_counts
+    result.stats["wicket_counts"] = dict(wicket_data)
 
     if wicket_data:
         most_common = max(wicket_data, key=wicket_data.get)
@@ -146,24 +125,18 @@ def summarize_wickets_pie(match_data):
 
         if other_types:
             summary += " Other types included: " + ", ".join(other_types) + "."
-        st.success(summary)
+        result.success(summary)
     else:
-        st.info("No wickets found in the match data.")
-
+        result.info("No wickets found in the match data.")
+    return result
 
-def summarize_partnership(match_data):
-    partnerships = defaultdict(int)
 
-    for inning in match_data["innings"]:
-        for over in inning["overs"]:
-            for delivery in over["deliveries"]:
-                batter = delivery["batter"]
-                non_striker = delivery["non_striker"]
-                runs = delivery["runs"]["total"]
-                pair = tuple(sorted([batter, non_striker]))
-                partnerships[pair] += runs
-
-    sorted_partnerships = sorted(partnerships.items(), key=lambda x: x[1], reverse=True)[:3]
+def partnership_summary(match_data):
+    result = SummaryResult("Partnership")
+    sorted_partnerships = as_match_aggregates(match_data).top_partnerships(3)
+    result.stats["top_partnerships"] = [
+        {"batters": list(pair), "runs": runs} for pair, runs in sorted_partnerships
+    ]
 
     if sorted_partnerships:
         main = sorted_partnerships[0]
@@ -171,35 +144,27 @@ def summarize_partnership(match_data):
 
         for pair, runs in sorted_partnerships[1:]:
             summary += f" Another key stand was **{pair[0]}** and **{pair[1]}**, adding **{runs} runs**."
-        st.success(summary)
+        result.success(summary)
     else:
-        st.info("No partnerships found in the data.")
-
+        result.info("No partnerships found in the data.")
+    return result
 
-def summarize_types_of_runs(match_data):
-    run_type_summary = {}
 
-    for inning in match_data["innings"]:
-        team = inning["team"]
-        run_types = defaultdict(int)
-
-        for over in inning["overs"]:
-            for delivery in over["deliveries"]:
-                if "runs" in delivery:
-                    batted = delivery["runs"]["batter"]
-                    if batted in [1, 2, 3, 4, 5, 6]:
-                        run_types[batted] += 1
-
-        run_type_summary[team] = dict(run_types)
+def types_of_runs_summary(match_data):
+    result = SummaryResult("Types of Runs")
+    run_type_summary = as_match_aggregates(match_data).run_types_by_team()
+    result.stats["run_types"] = {
+        team: {runs: int(count) for runs, count in enumerate(data)} for team, data in run_type_summary.items()
+    }
 
     summary_parts = []
 
     for team, data in run_type_summary.items():
-        singles = data.get(1, 0)
-        doubles = data.get(2, 0)
-        triples = data.get(3, 0)
-        fours = data.get(4, 0)
-        sixes = data.get(6, 0)
+        singles = int(data[1])
+        doubles = int(data[2])
+        triples = int(data[3])
+        fours = int(data[4])
+        sixes = int(data[6])
 
         sentence = (
             f"**{team}** scored {singles} singles, {doubles} doubles"
@@ -210,7 +175,36 @@ def summarize_types_of_runs(match_data):
 
     if len(summary_parts) == 2:
         merged_summary = f"{summary_parts[0]}, and {summary_parts[1]}."
-        st.success(merged_summary)
+        result.success(merged_summary)
     else:
         for s in summary_parts:
-            st.success(s)
+            result.success(s)
+    return result
+
+
+summarize_manhattan = streamlit_adapter(manhattan_summary)
+summarize_worm = streamlit_adapter(worm_summary)
+summarize_run_rate = streamlit_adapter(run_rate_summary)
+summarize_wickets_pie = streamlit_adapter(wickets_pie_summary)
+summarize_partnership = streamlit_adapter(partnership_summary)
+summarize_types_of_runs = streamlit_adapter(types_of_runs_summary)
+
+
+MATCH_REPORT = [
+    manhattan_summary,
+    worm_summary,
+    run_rate_summary,
+    wickets_pie_summary,
+    partnership_summary,
+    types_of_runs_summary,
+]
+
+
+def match_report(match_data):
+    # Aggregate once and build every match summary from the same result.
+    aggregates = as_match_aggregates(match_data)
+    return [build(aggregates) for build in MATCH_REPORT]
+
+
+def summarize_match_report(match_data):
+    return [render_summary(result) for result in match_report(match_data)]
@@ -0,0 +1,270 @@
+"""Lightweight per-stage timing and memory instrumentation.
+
+Wrap work in ``with stage("ocr"):`` (or decorate with ``@timed("ocr")``).
+Each stage records wall time, and peak traced allocations when tracemalloc
+is running, into the current request (see ``start_request``) and into
+process-wide histograms that ``write_metrics`` exports as Prometheus text
+or JSON.
+
+tracemalloc's peak is process-wide, so a stage only reports one when no
+other stage ran alongside it (another session, a panel worker thread);
+otherwise its ``peak_bytes`` is None.
+"""
+import bisect
+import contextvars
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+
+# Seconds; roughly log-spaced from 1 ms to 30 s.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SAMPLES = 1024
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.recent.append(value)
+
+    def quantile(self, q):
+        # From the most recent samples, which is what a latency dashboard
+        # wants and keeps memory fixed.
+        if not self.recent:
+            return 0.0
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency = {}
+        self.peak_bytes = {}
+
+    def observe(self, name, labels, seconds, peak):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.latency.setdefault(key, Histogram()).observe(seconds)
+            if peak is not None:
+                self.peak_bytes[key] = max(self.peak_bytes.get(key, 0), peak)
+
+    def clear(self):
+        with self._lock:
+            self.latency.clear()
+            self.peak_bytes.clear()
+
+    def snapshot(self):
+        with self._lock:
+            rows = []
+            for (name, labels), hist in sorted(self.latency.items()):
+                rows.append({
+                    "stage": name,
+                    "labels": dict(labels),
+                    "count": hist.count,
+                    "sum_s": hist.sum,
+                    "p50_s": hist.quantile(0.50),
+                    "p95_s": hist.quantile(0.95),
+                    "p99_s": hist.quantile(0.99),
+                    "max_peak_bytes": self.peak_bytes.get((name, labels)),
+                    "buckets": dict(zip([str(b) for b in hist.buckets] + ["+Inf"], _cumulative(hist.counts))),
+                })
+            return rows
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP graph_explainer_stage_seconds Wall time per processing stage.",
+            "# TYPE graph_explainer_stage_seconds histogram",
+        ]
+        peak_lines = [
+            "# HELP graph_explainer_stage_peak_bytes Largest traced allocation peak per stage.",
+            "# TYPE graph_explainer_stage_peak_bytes gauge",
+        ]
+        for row in self.snapshot():
+            labels = {"stage": row["stage"], **row["labels"]}
+            for le, count in row["buckets"].items():
+                lines.append(f"graph_explainer_stage_seconds_bucket{_labels({**labels, 'le': le})} {count}")
+            lines.append(f"graph_explainer_stage_seconds_sum{_labels(labels)} {row['sum_s']:.6f}")
+            lines.append(f"graph_explainer_stage_seconds_count{_labels(labels)} {row['count']}")
+            if row["max_peak_bytes"] is not None:
+                peak_lines.append(f"graph_explainer_stage_peak_bytes{_labels(labels)} {row['max_peak_bytes']}")
+        return "\n".join(lines + peak_lines) + "\n"
+
+
+def _cumulative(counts):
+    total, out = 0, []
+    for c in counts:
+        total += c
+        out.append(total)
+    return out
+
+
+def _labels(labels):
+    escaped = (f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+               for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+METRICS = MetricsRegistry()
+
+_request = contextvars.ContextVar("metrics_request", default=None)
+_frames = contextvars.ContextVar("metrics_frames", default=())
+
+
+class StageRecord:
+    __slots__ = ("name", "labels", "seconds", "peak_bytes", "depth")
+
+    def __init__(self, name, labels, seconds, peak_bytes, depth):
+        self.name = name
+        self.labels = labels
+        self.seconds = seconds
+        self.peak_bytes = peak_bytes
+        self.depth = depth
+
+    def as_dict(self):
+        return {"stage": self.name, "labels": self.labels, "seconds": self.seconds,
+                "peak_bytes": self.peak_bytes, "depth": self.depth}
+
+
+class _Frame:
+    __slots__ = ("start_bytes", "child_peak", "starts", "nested", "overlapped")
+
+    def __init__(self, start_bytes, starts, overlapped):
+        self.start_bytes = start_bytes  # None when tracemalloc is off
+        self.child_peak = 0
+        self.starts = starts  # stages started in the process so far
+        self.nested = 0  # of those started since, how many were nested in this one
+        self.overlapped = overlapped
+
+
+# Stages open and started across all threads, to tell a stage that ran
+# alone from one that shared the process-wide peak with others.
+_trace_lock = threading.Lock()
+_traced = {"open": 0, "starts": 0, "requests": 0, "started_here": False}
+
+
+@contextmanager
+def stage(name, **labels):
+    frames = _frames.get()
+    parent = frames[-1] if frames else None
+    with _trace_lock:
+        _traced["starts"] += 1
+        # Anything open besides this context's enclosing stages is running
+        # concurrently with this one.
+        overlapped = _traced["open"] != len(frames)
+        _traced["open"] += 1
+        start_bytes = None
+        if tracemalloc.is_tracing():
+            start_bytes, peak = tracemalloc.get_traced_memory()
+            if parent is not None:
+                # Resetting the peak below would lose what the enclosing
+                # stage has seen so far; remember it on that stage's frame.
+                parent.child_peak = max(parent.child_peak, peak)
+            tracemalloc.reset_peak()
+        frame = _Frame(start_bytes, _traced["starts"], overlapped)
+    token = _frames.set(frames + (frame,))
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - started
+        _frames.reset(token)
+        peak = None
+        with _trace_lock:
+            _traced["open"] -= 1
+            # A stage started meanwhile that was not nested in this one
+            # moved the shared peak under it.
+            frame.overlapped |= _traced["starts"] - frame.starts != frame.nested
+            absolute_peak = max(tracemalloc.get_traced_memory()[1], frame.child_peak)
+            if parent is not None:
+                parent.child_peak = max(parent.child_peak, absolute_peak)
+                parent.nested += frame.nested + 1
+                parent.overlapped |= frame.overlapped
+            if frame.start_bytes is not None and not frame.overlapped and tracemalloc.is_tracing():
+                peak = max(0, absolute_peak - frame.start_bytes)
+
+        METRICS.observe(name, labels, seconds, peak)
+        records = _request.get()
+        if records is not None:
+            records.append(StageRecord(name, labels, seconds, peak, len(frames)))
+
+
+def timed(name, **labels):
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name, **labels):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RequestStages(list):
+    traces_memory = False
+
+
+def start_request(trace_memory=False):
+    """Collect the stages of the current request into a fresh list.
+
+    Stages are appended in completion order, so nested stages come before
+    the stage that encloses them. ``trace_memory`` turns tracemalloc on
+    until ``finish_request``; an unfinished request of the same context is
+    finished first.
+    """
+    previous = _request.get()
+    if previous is not None:
+        finish_request(previous)
+    records = RequestStages()
+    if trace_memory:
+        with _trace_lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _traced["started_here"] = True
+            _traced["requests"] += 1
+            records.traces_memory = True
+    _request.set(records)
+    return records
+
+
+def finish_request(records):
+    # Tracing slows every allocation in the process, so it stops as soon as
+    # the last request that asked for it is done (unless someone else, e.g.
+    # the benchmarks, had started it).
+    with _trace_lock:
+        if not getattr(records, "traces_memory", False):
+            return
+        records.traces_memory = False
+        _traced["requests"] -= 1
+        if _traced["requests"] == 0 and _traced["started_here"]:
+            tracemalloc.stop()
+            _traced["started_here"] = False
+
+
+def write_metrics(path, registry=METRICS):
+    # .json gets the snapshot with p50/p95/p99; anything else gets the
+    # Prometheus text exposition format.
+    if path.endswith(".json"):
+        content = json.dumps({"stages": registry.snapshot()}, indent=2)
+    else:
+        content = registry.prometheus_text()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp, path)
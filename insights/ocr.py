@@ -0,0 +1,150 @@
+import os
+from collections import namedtuple
+
+from insights.metrics import stage
+from insights.ocr_backend import get_backend
+from insights.ocr_cache import OCR_CACHE, image_cache_key
+from insights.preprocess import title_strip_image
+
+
+# Title/axis strips are short single lines of text laid out as one block.
+STRIP_CONFIG = "--psm 6"
+TITLE_STRIPS_ENABLED = os.environ.get("OCR_TITLE_STRIPS", "1") != "0"
+
+
+OcrWord = namedtuple("OcrWord", ["text", "conf", "left", "top", "width", "height"])
+
+
+def normalize_text(text):
+    # Lowercase and collapse newlines/tabs/repeated spaces so keyword checks
+    # don't depend on how tesseract broke the lines.
+    return " ".join(text.lower().split())
+
+
+class OcrResult:
+    """Text, word boxes and confidences from a single tesseract pass."""
+
+    def __init__(self, raw_text, words):
+        self.raw_text = raw_text
+        self.text = normalize_text(raw_text)
+        self.words = words
+
+    def to_dict(self):
+        return {"raw_text": self.raw_text, "words": [list(w) for w in self.words]}
+
+    @classmethod
+    def from_dict(cls, payload):
+        return cls(payload["raw_text"], [OcrWord(*w) for w in payload["words"]])
+
+    def __repr__(self):
+        return f"OcrResult(text={self.text[:40]!r}, words={len(self.words)})"
+
+
+def result_from_data(data):
+    # image_to_data gives us the words, their boxes and confidences in one
+    # call; the plain text is rebuilt from the line numbers it reports.
+    words = []
+    lines = {}
+    for i, word in enumerate(data["text"]):
+        word = word.strip()
+        if not word:
+            continue
+        words.append(OcrWord(
+            text=word,
+            conf=float(data["conf"][i]),
+            left=int(data["left"][i]),
+            top=int(data["top"][i]),
+            width=int(data["width"][i]),
+            height=int(data["height"][i]),
+        ))
+        line_key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+        lines.setdefault(line_key, []).append(word)
+
+    raw_text = "\n".join(" ".join(line) for line in lines.values())
+    return OcrResult(raw_text, words)
+
+
+def run_ocr(image, config="", backend=None):
+    backend = backend or get_backend()
+    with stage("ocr", backend=backend.name):
+        return result_from_data(backend.image_to_data(image, config))
+
+
+def _cache_key(image, config, backend):
+    # Engines can read the same pixels slightly differently, so results are
+    # cached per backend.
+    return image_cache_key(image, f"{backend.name}:{config}")
+
+
+def cached_ocr(image, config="", cache=OCR_CACHE):
+    backend = get_backend()
+    key = _cache_key(image, config, backend)
+    payload = cache.get(key)
+    if payload is not None:
+        return OcrResult.from_dict(payload)
+
+    result = run_ocr(image, config, backend)
+    cache.put(key, result.to_dict())
+    return result
+
+
+def ocr_many(images, config="", cache=OCR_CACHE):
+    # Batched ocr_image: cached images are answered straight away and the
+    # rest go to the backend in a single call.
+    backend = get_backend()
+    results = [image if isinstance(image, OcrResult) else None for image in images]
+    keys = {}
+    for i, image in enumerate(images):
+        if results[i] is None:
+            keys[i] = _cache_key(image, config, backend)
+            payload = cache.get(keys[i])
+            if payload is not None:
+                results[i] = OcrResult.from_dict(payload)
+
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        with stage("ocr_batch", backend=backend.name):
+            data = backend.images_to_data([images[i] for i in missing], config)
+        for i, columns in zip(missing, data):
+            results[i] = result_from_data(columns)
+            cache.put(keys[i], results[i].to_dict())
+    return results
+
+
+def ocr_image(image, config=""):
+    # Accept either an image or an OcrResult that was already computed, so
+    # callers can OCR once and hand the result to every detector. Fresh
+    # images go through the OCR cache before tesseract is called.
+    if isinstance(image, OcrResult):
+        return image
+    return cached_ocr(image, config)
+
+
+def detect_with_title_strips(image, detect):
+    # Try the cheap title/axis strips first and only OCR the full image when
+    # `detect` finds nothing in them.
+    if isinstance(image, OcrResult):
+        return detect(image.text)
+
+    if TITLE_STRIPS_ENABLED:
+        result = detect(ocr_image(title_strip_image(image), STRIP_CONFIG).text)
+        if result:
+            return result
+    return detect(ocr_image(image).text)
+
+
+def detect_many_with_title_strips(images, detect):
+    # detect_with_title_strips for several images: all their strips go to
+    # the backend as one batch, then the full images still without an
+    # answer as a second.
+    found = [detect(image.text) if isinstance(image, OcrResult) else None for image in images]
+    pending = [i for i, image in enumerate(images) if not isinstance(image, OcrResult)]
+    if TITLE_STRIPS_ENABLED and pending:
+        strips = ocr_many([title_strip_image(images[i]) for i in pending], STRIP_CONFIG)
+        for i, result in zip(pending, strips):
+            found[i] = detect(result.text)
+        pending = [i for i in pending if not found[i]]
+    if pending:
+        for i, result in zip(pending, ocr_many([images[i] for i in pending])):
+            found[i] = detect(result.text)
+    return found
@@ -0,0 +1,187 @@
+"""Tesseract engines behind one interface.
+
+A backend turns images into ``image_to_data``-style column dicts (text,
+conf, boxes, block/par/line numbers); insights.ocr shapes those into
+OcrResults and caches them. Pick one with ``OCR_BACKEND``:
+
+- ``tesserocr``: the tesseract C++ API in-process. A small pool of warm
+  engines keeps the language model loaded and takes images straight from
+  memory; tesserocr releases the GIL while recognizing, so batches run
+  across the pool in parallel.
+- ``pytesseract``: spawns the ``tesseract`` CLI per image. Always works
+  when the binary is installed, but pays process start, temp files and
+  model loading every call; a batch runs one process per CPU at a time.
+- ``auto`` (default): tesserocr when it is installed and finds its
+  language data, otherwise pytesseract.
+"""
+import os
+import queue
+import shlex
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+DATA_COLUMNS = ("level", "page_num", "block_num", "par_num", "line_num", "word_num",
+                "left", "top", "width", "height", "conf", "text")
+DEFAULT_PSM = 3  # tesseract's own default: fully automatic page segmentation
+
+
+def parse_config(config):
+    # Returns (psm or None, {variable: value}) for a tesseract CLI config
+    # string such as "--psm 6 -c preserve_interword_spaces=1".
+    psm, variables = None, {}
+    args = shlex.split(config)
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == "--psm" and i + 1 < len(args):
+            psm = int(args[i + 1])
+            i += 2
+        elif arg == "-c" and i + 1 < len(args) and "=" in args[i + 1]:
+            name, value = args[i + 1].split("=", 1)
+            variables[name] = value
+            i += 2
+        else:
+            raise ValueError(f"Unsupported OCR config option {arg!r}")
+    return psm, variables
+
+
+def parse_tsv(tsv):
+    data = {column: [] for column in DATA_COLUMNS}
+    for line in tsv.splitlines():
+        fields = line.split("\t")
+        if len(fields) < len(DATA_COLUMNS) - 1 or fields[0] == "level":
+            continue
+        if len(fields) == len(DATA_COLUMNS) - 1:
+            fields.append("")  # non-word rows have no text column
+        for column, value in zip(DATA_COLUMNS, fields):
+            data[column].append(value if column == "text" else float(value) if column == "conf" else int(value))
+    return data
+
+
+class OcrBackend:
+    name = "base"
+    size = 1  # images a batch recognizes at once
+
+    def image_to_data(self, image, config=""):
+        raise NotImplementedError
+
+    def images_to_data(self, images, config=""):
+        images = list(images)
+        if len(images) <= 1 or self.size <= 1:
+            return [self.image_to_data(image, config) for image in images]
+        with ThreadPoolExecutor(max_workers=min(self.size, len(images))) as executor:
+            return list(executor.map(lambda image: self.image_to_data(image, config), images))
+
+    def close(self):
+        pass
+
+
+class PytesseractBackend(OcrBackend):
+    name = "pytesseract"
+
+    def __init__(self, size=None):
+        self.size = size or os.cpu_count() or 1
+
+    def image_to_data(self, image, config=""):
+        # pytesseract pulls in pandas, so it is only imported once OCR is
+        # needed.
+        import pytesseract
+        from pytesseract import Output
+
+        return pytesseract.image_to_data(image, config=config, output_type=Output.DICT)
+
+
+class TesserocrBackend(OcrBackend):
+    name = "tesserocr"
+
+    def __init__(self, lang="eng", size=None):
+        import tesserocr
+
+        self._tesserocr = tesserocr
+        self.lang = lang
+        self.size = size or os.cpu_count() or 1
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        # Load one engine now so a missing language pack fails here, where
+        # auto mode can still fall back, rather than on the first upload.
+        self._idle.put(self._create())
+
+    def _create(self):
+        api = self._tesserocr.PyTessBaseAPI(lang=self.lang)
+        self._created += 1
+        return api
+
+    def _acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                return self._create()
+        return self._idle.get()
+
+    def image_to_data(self, image, config=""):
+        psm, variables = parse_config(config)
+        api = self._acquire()
+        previous = {name: api.GetVariableAsString(name) for name in variables}
+        try:
+            api.SetPageSegMode(DEFAULT_PSM if psm is None else psm)
+            for name, value in variables.items():
+                api.SetVariable(name, value)
+            api.SetImage(image)
+            return parse_tsv(api.GetTSVText(0))
+        finally:
+            for name, value in previous.items():
+                if value is not None:
+                    api.SetVariable(name, value)
+            api.Clear()
+            self._idle.put(api)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().End()
+            except queue.Empty:
+                return
+
+
+BACKENDS = {
+    "tesserocr": TesserocrBackend,
+    "pytesseract": PytesseractBackend,
+}
+
+
+def create_backend(name="auto"):
+    if name != "auto":
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown OCR backend {name!r}; choose from auto, {', '.join(BACKENDS)}")
+        return BACKENDS[name]()
+    try:
+        return TesserocrBackend()
+    except ImportError:
+        return PytesseractBackend()
+    except RuntimeError as e:
+        print("tesserocr unavailable, falling back to pytesseract:", e)
+        return PytesseractBackend()
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend(os.environ.get("OCR_BACKEND", "auto"))
+    return _backend
+
+
+def set_backend(backend):
+    global _backend
+    previous, _backend = _backend, backend
+    return previous
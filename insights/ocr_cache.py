@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def image_cache_key(image, config=""):
+    # Content address: the decoded pixels plus everything that changes what
+    # tesseract would return for them.
+    h = hashlib.sha256()
+    h.update(f"{image.mode}|{image.size[0]}x{image.size[1]}|{config}|".encode())
+    h.update(image.tobytes())
+    return h.hexdigest()
+
+
+class OcrCache:
+    """Two-tier cache for OCR payloads.
+
+    The memory tier is an LRU bounded by the serialized size of its entries.
+    The optional disk tier keeps one JSON file per key under ``directory``;
+    files are written to a temp name and renamed into place so several
+    worker processes can share the directory safely.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        max_bytes = int(os.environ.get("OCR_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        directory = os.environ.get("OCR_CACHE_DIR") or None
+        return cls(max_bytes=max_bytes, directory=directory)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return self._entries[key][0]
+
+        payload = self._read_disk(key)
+        with self._lock:
+            if payload is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, payload, len(json.dumps(payload)))
+        return payload
+
+    def put(self, key, payload):
+        encoded = json.dumps(payload)
+        self._remember(key, payload, len(encoded))
+        self._write_disk(key, encoded)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _remember(self, key, payload, size):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (payload, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def _read_disk(self, key):
+        if not self.directory:
+            return None
+        try:
+            with open(self._path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key, encoded):
+        if not self.directory:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(encoded)
+            os.replace(tmp, path)
+        except OSError as e:
+            print("OCR cache write failed:", e)
+
+
+OCR_CACHE = OcrCache.from_env()
+
+
+def cache_stats():
+    return OCR_CACHE.stats()
@@ -0,0 +1,113 @@
+"""Split a dashboard screenshot into its chart panels.
+
+Broadcast dashboards put several charts side by side with blank gutters
+between them. A recursive XY-cut finds those gutters on a downscaled
+copy: rows (then columns) with no ink that are wide enough and leave
+panels of a plausible size on both sides. Each panel is then detected on
+its own; the panels that need OCR are sent to the backend as one batch,
+which a tesserocr pool (or parallel tesseract processes) works through
+side by side.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from insights.detect import detect_graph_source_from_image, detect_graphs_from_images
+from insights.metrics import stage
+
+
+# Gutters are looked for on a copy this wide.
+ANALYSIS_WIDTH = 800
+# Grey levels away from the background that count as ink.
+INK_THRESHOLD = 40
+# A gutter is at least this fraction of the region it splits...
+MIN_GUTTER = 0.01
+# ...and every panel at least this fraction of the whole image's side, so
+# the gap under a chart title or between bars is never taken for a gutter.
+MIN_PANEL = 0.2
+
+
+# ``source`` is how the panel was detected ("visual" or "ocr"), when known.
+Panel = namedtuple("Panel", ["box", "category", "graph_type", "source"], defaults=[None])
+
+
+def ink_mask(gray):
+    # Background is whatever most of the border is (white or a dark theme).
+    border = np.concatenate([gray[0], gray[-1], gray[:, 0], gray[:, -1]])
+    background = np.median(border)
+    return np.abs(gray.astype(np.int16) - background) > INK_THRESHOLD
+
+
+def _cuts(has_ink, min_gutter, min_panel):
+    # Split positions along one axis: the middles of inner blank runs, widest
+    # first, kept only while every piece stays at least min_panel long.
+    n = len(has_ink)
+    edges = np.flatnonzero(np.diff(np.concatenate([[1], has_ink.astype(np.int8), [1]])))
+    runs = [(end - start, start, end) for start, end in zip(edges[::2], edges[1::2])
+            if start > 0 and end < n and end - start >= min_gutter]
+
+    cuts = []
+    for _, start, end in sorted(runs, reverse=True):
+        bounds = sorted(cuts + [(start + end) // 2])
+        pieces = np.diff([0] + bounds + [n])
+        if pieces.min() >= min_panel:
+            cuts = bounds
+    return cuts
+
+
+def _xy_cut(mask, box, min_size, vertical=False):
+    left, top, right, bottom = box
+    region = mask[top:bottom, left:right]
+    for axis_vertical in (vertical, not vertical):
+        profile = region.any(axis=0) if axis_vertical else region.any(axis=1)
+        length = right - left if axis_vertical else bottom - top
+        cuts = _cuts(profile, max(2, round(length * MIN_GUTTER)), min_size[0 if axis_vertical else 1])
+        if not cuts:
+            continue
+        bounds = [0] + cuts + [length]
+        panels = []
+        for start, end in zip(bounds, bounds[1:]):
+            sub = (left + start, top, left + end, bottom) if axis_vertical else (left, top + start, right, top + end)
+            panels.extend(_xy_cut(mask, sub, min_size, not axis_vertical))
+        return panels
+    return [box]
+
+
+def find_panels(image):
+    """Panel boxes ``(left, top, right, bottom)`` in reading order.
+
+    A single chart comes back as one box covering the whole image.
+    """
+    from PIL import Image
+
+    scale = min(1.0, ANALYSIS_WIDTH / image.width)
+    small = image.convert("L")
+    if scale < 1.0:
+        small = small.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                             Image.BILINEAR, reducing_gap=2.0)
+    mask = ink_mask(np.asarray(small))
+    height, width = mask.shape
+    boxes = _xy_cut(mask, (0, 0, width, height), (width * MIN_PANEL, height * MIN_PANEL))
+    if len(boxes) == 1:
+        return [(0, 0, image.width, image.height)]
+    return [
+        (round(l / scale), round(t / scale), min(image.width, round(r / scale)), min(image.height, round(b / scale)))
+        for l, t, r, b in boxes
+    ]
+
+
+def detect_panels(image, detect=detect_graph_source_from_image, detect_many=detect_graphs_from_images):
+    """Find the panels in an image and detect each one's graph.
+
+    Returns a list of Panel(box, category, graph_type, source). A single
+    chart is detected on the whole image with ``detect``, exactly as
+    before; several panels go to ``detect_many`` together. Either may also
+    return just (category, graph_type), leaving ``source`` None.
+    """
+    with stage("segment"):
+        boxes = find_panels(image)
+    if len(boxes) == 1:
+        return [Panel(boxes[0], *detect(image))]
+
+    tiles = [image.crop(box) for box in boxes]
+    return [Panel(box, *found) for box, found in zip(boxes, detect_many(tiles))]
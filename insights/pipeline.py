@@ -0,0 +1,117 @@
+import io
+
+from insights.detect import detect_graph_from_document
+from insights.ingest import ingest_image
+from insights.metrics import stage
+from insights.panels import detect_panels
+from insights.registry import build_summary
+from insights.result_cache import RESULT_CACHE
+from insights.snapshot import load_upload
+from insights.summary import SummaryMessage, SummaryResult
+
+
+class UploadError(ValueError):
+    """An upload that cannot be read: bad JSON, a stale snapshot, an image
+    PIL cannot decode or one over the ingest budgets."""
+
+
+def explain(image_file=None, json_file=None, category=None, graph_type=None):
+    """Detect and summarize one graph/JSON pair.
+
+    ``image_file`` and ``json_file`` are paths or binary file objects; either
+    may be None, and ``json_file`` may also be a snapshot (insights.snapshot).
+    Passing ``category`` and ``graph_type`` skips detection; otherwise the
+    JSON is tried first and the image is only decoded and OCR'd when the
+    JSON does not name the graph. Returns a JSON-ready dict with the
+    category, graph type, how it was detected (``detected_by``: "schema",
+    "visual" or "ocr"), summary messages and stats, plus ``error`` when the
+    pair could not be summarized. Raises UploadError when either file
+    cannot be read at all.
+
+    A dashboard image with several chart panels also gets ``panels``: one
+    entry per panel with its box and its own fields as above. The top-level
+    fields then describe the first panel that could be summarized.
+    """
+    result = {"category": category or "unknown", "graph_type": graph_type, "summary": []}
+
+    document = aggregates = None
+    if json_file is not None:
+        try:
+            document, aggregates = load_upload(json_file)
+        except ValueError as e:
+            raise UploadError(f"Could not read the JSON: {e}") from e
+
+    panels = []
+    if graph_type is None:
+        found = detect_graph_from_document(document) if document is not None else None
+        if found is not None:
+            result["detected_by"] = "schema"
+        elif image_file is not None:
+            try:
+                image = ingest_image(image_file)
+            except ValueError as e:
+                raise UploadError(str(e)) from e
+            panels = detect_panels(image)
+            found = panels[0].category, panels[0].graph_type
+            result["detected_by"] = panels[0].source
+        result["category"], result["graph_type"] = found or ("unknown", None)
+
+    if json_file is not None:
+        data = aggregates if aggregates is not None else document
+        if len(panels) > 1:
+            result["panels"] = [
+                dict(panel_summary(p.category, p.graph_type, data), detected_by=p.source, box=list(p.box))
+                for p in panels
+            ]
+            first = next((p for p in result["panels"] if "error" not in p), result["panels"][0])
+            result.update({k: v for k, v in first.items() if k != "box"})
+        else:
+            result.update(panel_summary(result["category"], result["graph_type"], data))
+    return result
+
+
+def panel_summary(category, graph_type, data):
+    try:
+        summary = build_summary(category, graph_type, data)
+    except (KeyError, TypeError, AttributeError) as e:
+        # e.g. a panel detected as a player graph next to a match upload
+        print(f"Could not summarize {graph_type}:", e)
+        summary = None
+    if summary is None:
+        return {"category": category, "graph_type": graph_type, "summary": [],
+                "error": "Could not identify graph type."}
+    return {"category": category, "graph_type": graph_type, **summary_fields(summary)}
+
+
+def summary_fields(summary):
+    return {"summary": summary.to_dict()["messages"], "stats": summary.stats}
+
+
+def summary_from_result(result):
+    # The SummaryResult inside an explain() result, e.g. one from the cache.
+    messages = [SummaryMessage(**m) for m in result.get("summary", [])]
+    return SummaryResult(result["graph_type"], messages, result.get("stats", {}))
+
+
+def explain_bytes(image_bytes=None, json_bytes=None, category=None, graph_type=None, cache=RESULT_CACHE):
+    """explain() for in-memory uploads, served from the shared result cache.
+
+    A pair seen before (same bytes, same engine version) is answered
+    without OCR or JSON parsing; new results without an error are stored.
+    Explicit ``category``/``graph_type`` requests bypass the cache.
+    """
+    use_cache = cache is not None and graph_type is None
+    if use_cache:
+        with stage("result_cache"):
+            cached = cache.get(image_bytes, json_bytes)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+    result = explain(
+        io.BytesIO(image_bytes) if image_bytes is not None else None,
+        io.BytesIO(json_bytes) if json_bytes is not None else None,
+        category, graph_type,
+    )
+    if use_cache and "error" not in result:
+        cache.put(image_bytes, json_bytes, result)
+    return result
@@ -0,0 +1,205 @@
+import numpy as np
+
+from insights.deliveries import interned
+
+
+# Wagon wheel region codes as they appear in the payload.
+REGION_NAMES = {
+    "1": "Mid-wicket",
+    "2": "Mid-on",
+    "3": "Mid-off",
+    "4": "Cover",
+    "5": "Point",
+    "6": "Square leg",
+}
+_REGION_CODES = {name.lower(): code for code, name in REGION_NAMES.items()}
+
+# A payload loaded from a snapshot carries its prebuilt cube under this key.
+PLAYER_CUBE_KEY = "_player_cube"
+
+# The payload series a cube is built from.
+CUBE_SERIES = ("wagon_wheel_graph_data", "shot_runs_graph_data", "shot_outs_graph_data", "types_of_runs_graph_data")
+
+
+class PlayerCube:
+    """A player payload's shot data, aggregated once into dense arrays.
+
+    ``balls[r, b, s, v]`` counts wagon wheel entries by region, bowling type,
+    shot and run value, and ``runs`` is the same cube weighted by run value.
+    Labels for each axis are kept in first-seen order (a missing region or
+    shot is the label None), so argmax picks the same entry on ties as the
+    original walks over the payload did. The shot runs/outs and types of
+    runs series keep one value per payload row, duplicates included, and
+    share the shot and bowling type labels; ``*_order`` holds each row's
+    label code. Values keep the payload's numbers (ints stay ints, floats
+    floats). A malformed series is left empty with its exception in
+    ``errors[series]``, so it only fails that series' summary.
+    """
+
+    def __init__(self, regions, bowling_types, shots, run_values, balls,
+                 shot_runs, shot_runs_order, shot_outs, shot_outs_order, run_types, run_types_order):
+        self.regions = regions
+        self.bowling_types = bowling_types
+        self.shots = shots
+        self.run_values = run_values
+        self.balls = balls
+        self.runs = (balls * np.asarray(run_values, dtype=np.int64)).sum(axis=3)
+        self.shot_runs = shot_runs
+        self.shot_runs_order = shot_runs_order
+        self.shot_outs = shot_outs
+        self.shot_outs_order = shot_outs_order
+        self.run_types = run_types
+        self.run_types_order = run_types_order
+        self._index = [{label: i for i, label in enumerate(axis)} for axis in (regions, bowling_types, shots)]
+        self.errors = {}
+
+    def __repr__(self):
+        return (f"PlayerCube({len(self.regions)} regions x {len(self.bowling_types)} bowling types x "
+                f"{len(self.shots)} shots, {int(self.balls.sum())} entries)")
+
+    def _slice(self, region=None, bowling_type=None, shot=None):
+        # Index for one cell or a whole axis; unknown labels select nothing.
+        keys = []
+        for index, label in zip(self._index, (region, bowling_type, shot)):
+            if label is None:
+                keys.append(slice(None))
+            elif label in index:
+                keys.append(index[label])
+            else:
+                return None
+        return tuple(keys)
+
+    def _region(self, region):
+        # Accepts the payload code ("4") or the fielding position ("Cover").
+        if region is None or region in self._index[0]:
+            return region
+        return _REGION_CODES.get(str(region).lower(), region)
+
+    def runs_for(self, region=None, bowling_type=None, shot=None):
+        """Runs scored in the given slice, e.g. runs_for("Cover", "Left-arm spin")."""
+        keys = self._slice(self._region(region), bowling_type, shot)
+        return 0 if keys is None else int(self.runs[keys].sum())
+
+    def balls_for(self, region=None, bowling_type=None, shot=None, run_value=None):
+        keys = self._slice(self._region(region), bowling_type, shot)
+        if keys is None or (run_value is not None and run_value not in self.run_values):
+            return 0
+        cells = self.balls[keys]
+        if run_value is not None:
+            cells = cells[..., self.run_values.index(run_value)]
+        return int(cells.sum())
+
+    def region_runs(self):
+        totals = self.runs.sum(axis=(1, 2))
+        return {r: int(totals[i]) for i, r in enumerate(self.regions) if r}
+
+    def bowling_type_runs(self):
+        # Only bowling types faced in the wagon wheel; the axis also holds
+        # types that appear just in the types of runs series.
+        totals = self.runs.sum(axis=(0, 2))
+        faced = self.balls.sum(axis=(0, 2, 3)) > 0
+        return {b: int(totals[i]) for i, b in enumerate(self.bowling_types) if faced[i]}
+
+    def top_shots_by_runs(self, n=3):
+        # Payload rows ranked by runs, ties in payload order like sorted().
+        ranked = np.argsort(-self.shot_runs, kind="stable")[:n]
+        return [(self.shots[self.shot_runs_order[i]], self.shot_runs[i].item()) for i in ranked]
+
+    def most_dismissed_shot(self):
+        if not len(self.shot_outs_order):
+            return None
+        i = np.argmax(self.shot_outs)
+        return self.shots[self.shot_outs_order[i]], self.shot_outs[i].item()
+
+    def run_type_leader(self, field):
+        # The types of runs row with the largest ``field``, first row on ties.
+        i = np.argmax(self.run_types[field])
+        row = {name: values[i].item() for name, values in self.run_types.items()}
+        return dict(row, bowling_type_name=self.bowling_types[self.run_types_order[i]])
+
+
+# Types of runs columns, one value per row, with their dtypes when empty.
+RUN_TYPE_FIELDS = {"total_runs": np.int64, "dot_balls": np.int64, "per_dot_balls": np.float64, "boundaries_run": np.int64}
+
+
+def _numbers(rows, field, dtype=np.int64):
+    # One value per row, as the payload gives it; anything but a number
+    # (null, "12") fails the series rather than being coerced.
+    values = [row.get(field, 0) for row in rows]
+    for value in values:
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"{field} must be a number, got {value!r}")
+    return np.asarray(values) if values else np.zeros(0, dtype=dtype)
+
+
+def build_player_cube(data):
+    """Aggregate a player payload's ``data`` into a PlayerCube in one pass."""
+    regions, bowling_types, shots, run_values = {}, {}, {}, {}
+    errors = {}
+    wagon = data.get("wagon_wheel_graph_data") or []
+    try:
+        cells = np.array([
+            [regions.setdefault(e.get("wagon_part") or None, len(regions)) for e in wagon],
+            [bowling_types.setdefault(e.get("bowling_type_name", "Unknown"), len(bowling_types)) for e in wagon],
+            [shots.setdefault(e.get("shot_name") or None, len(shots)) for e in wagon],
+            [run_values.setdefault(int(e.get("run", 0)), len(run_values)) for e in wagon],
+        ], dtype=np.int64).reshape(4, len(wagon))
+    except (ValueError, TypeError, AttributeError) as e:
+        regions, bowling_types, shots, run_values = {}, {}, {}, {}
+        cells, errors["wagon_wheel_graph_data"] = np.zeros((4, 0), dtype=np.int64), e
+
+    def shot_series(key, field):
+        try:
+            rows = data.get(key) or []
+            values = _numbers(rows, field)
+            return np.asarray([interned(shots, row.get("shot_name")) for row in rows], dtype=np.int64), values
+        except (ValueError, TypeError, AttributeError) as e:
+            errors[key] = e
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    shot_runs_order, shot_runs = shot_series("shot_runs_graph_data", "runs")
+    shot_outs_order, shot_outs = shot_series("shot_outs_graph_data", "outs")
+
+    try:
+        rows = data.get("types_of_runs_graph_data") or []
+        _numbers(rows, "total_runs")
+        valid = [r for r in rows if r.get("bowling_type_name") and r.get("total_runs", 0) > 0]
+        run_types = {field: _numbers(valid, field, dtype) for field, dtype in RUN_TYPE_FIELDS.items()}
+        run_types_order = np.asarray([interned(bowling_types, r["bowling_type_name"]) for r in valid], dtype=np.int64)
+    except (ValueError, TypeError, AttributeError) as e:
+        errors["types_of_runs_graph_data"] = e
+        run_types = {field: np.zeros(0, dtype=dtype) for field, dtype in RUN_TYPE_FIELDS.items()}
+        run_types_order = np.zeros(0, dtype=np.int64)
+
+    shape = (len(regions), len(bowling_types), len(shots), len(run_values))
+    balls = np.bincount(np.ravel_multi_index(cells, shape), minlength=int(np.prod(shape))).reshape(shape)
+
+    cube = PlayerCube(
+        list(regions), list(bowling_types), list(shots), list(run_values), balls,
+        shot_runs, shot_runs_order,
+        shot_outs, shot_outs_order,
+        run_types, run_types_order,
+    )
+    cube.errors = errors
+    return cube
+
+
+def attach_player_cube(document):
+    """Build a player document's cube once, under ``data[PLAYER_CUBE_KEY]``.
+
+    Documents without the player series are left alone.
+    """
+    payload = document.get("data") if isinstance(document, dict) else None
+    if isinstance(payload, dict) and PLAYER_CUBE_KEY not in payload and any(key in payload for key in CUBE_SERIES):
+        payload[PLAYER_CUBE_KEY] = build_player_cube(payload)
+    return document
+
+
+def as_player_cube(data):
+    # Uploads arrive with their cube attached; a bare payload is aggregated
+    # on the spot, the same way as_match_aggregates() treats raw match JSON.
+    if isinstance(data, PlayerCube):
+        return data
+    if PLAYER_CUBE_KEY in data:
+        return data[PLAYER_CUBE_KEY]
+    return build_player_cube(data)
@@ -1,51 +1,36 @@
-import pytesseract
-from collections import defaultdict
-import streamlit as st
-from datetime import datetime
+from collections import Counter
+
+from insights.ocr import detect_with_title_strips
+from insights.player_cube import REGION_NAMES, as_player_cube
+from insights.render import streamlit_adapter
+from insights.rules import classify_text
+from insights.summary import SummaryResult
+
+
+def detect_player_graph_type_from_text(text):
+    result = classify_text(text, category="player")
+    return result.graph_type if result else None
 
-import pytesseract
-import re
 
 def detect_player_graph_type_from_image(image):
-    try:
-        text = pytesseract.image_to_string(image).lower()
-
-        # Count occurrences of relevant keywords
-        runs_count = len(re.findall(r"\bruns?\b", text))
-        outs_count = len(re.findall(r"\b(out|outs|wickets)\b", text))
-
-        if "types of runs" in text:
-            return "player_run_types"
-        
-        elif "shot" in text and "analysis" in text:
-            if runs_count > outs_count:
-                return "player_shot_analysis_runs"
-            elif outs_count > runs_count:
-                return "player_shot_analysis_outs"
-            else:
-                return "player_shot_analysis_unknown"
-
-        elif "current form" in text:
-            return "player_current_form"
-        elif "playing style" in text:
-            return "player_playing_style"
-        elif "wagon wheel" in text:
-            return "player_wagon_wheel"
-        elif "batting position" in text:
-            return "player_position"
-        elif "bowling type" in text:
-            return "player_vs_bowling"
+    from insights.visual import predict_graph
 
+    found = predict_graph(image, category="player")
+    if found is not None:
+        return found[1]
+    try:
+        return detect_with_title_strips(image, detect_player_graph_type_from_text)
     except Exception as e:
         print("OCR failed:", e)
 
     return None
 
-def summarize_player_current_form(data):
+def player_current_form_summary(data):
+    result = SummaryResult("player_current_form")
     matches = data.get("current_form_graph_data", [])
     if not matches:
-        st.warning("No current form data found.")
-        return
+        result.warning("No current form data found.")
+        return result
 
     total_runs = sum(m["runs"] for m in matches)
     total_balls = sum(m["balls"] for m in matches)
@@ -57,7 +42,7 @@ def summarize_player_current_form(data):
     sr = (total_runs / total_balls * 100) if total_balls else 0
 
     top_score = max(matches, key=lambda x: x["runs"])
-    dismissal_freq = max(set(dismissals), key=dismissals.count) if dismissals else None
+    dismissal_freq = Counter(dismissals).most_common(1)[0][0] if dismissals else None
 
     lines = [
         f"📈 Over the last **{innings} innings**, the batsman scored **{total_runs} runs** at an average of **{avg:.2f}** and a strike rate of **{sr:.2f}**.",
@@ -67,15 +52,19 @@ def summarize_player_current_form(data):
     if dismissal_freq:
         lines.append(f"and the most common dismissal was **{dismissal_freq}**.")
 
-    st.success("\n".join(lines))
+    result.success("\n".join(lines))
+    result.stats.update(innings=innings, runs=total_runs, balls=total_balls, outs=outs,
+                        average=avg, strike_rate=sr, top_score=top_score["runs"],
+                        common_dismissal=dismissal_freq)
+    return result
 
-import streamlit as st
 
-def summarize_player_playing_style(data):
+def player_playing_style_summary(data):
+    result = SummaryResult("player_playing_style")
     graph_data = data.get("playing_style_graph_data", {}).get("all", [])
     if not graph_data:
-        st.warning("No playing style data found.")
-        return
+        result.warning("No playing style data found.")
+        return result
 
     total_runs = sum(int(d["runs"]) for d in graph_data)
     total_balls = len(graph_data)
@@ -91,48 +80,32 @@ def summarize_player_playing_style(data):
         f"⚡ Based on run trends, the player **{intent}**."
     )
 
-    st.success(summary)
+    result.success(summary)
+    result.stats.update(runs=total_runs, balls=total_balls, strike_rate=sr, first5=first5, last5=last5)
+    return result
 
 
-def summarize_player_wagon_wheel(data):
+def player_wagon_wheel_summary(data):
+    result = SummaryResult("player_wagon_wheel")
     try:
-        entries = data.get("wagon_wheel_graph_data", [])
-        if not entries:
-            st.warning("No wagon wheel data available.")
-            return
-
-        from collections import defaultdict, Counter
+        cube = as_player_cube(data)
+        if "wagon_wheel_graph_data" in cube.errors:
+            raise cube.errors["wagon_wheel_graph_data"]
+        if not cube.balls.any():
+            result.warning("No wagon wheel data available.")
+            return result
 
-        region_runs = defaultdict(int)
-        bowler_type_counter = Counter()
-
-        for entry in entries:
-            run = int(entry.get("run", 0))
-            region = entry.get("wagon_part")
-            bowling_type = entry.get("bowling_type_name", "Unknown")
-
-            if region:
-                region_runs[region] += run
-            bowler_type_counter[bowling_type] += run
+        region_runs = cube.region_runs()
+        bowling_type_runs = cube.bowling_type_runs()
 
         if not region_runs:
-            st.warning("No valid region data found.")
-            return
-
-        # Map region number to readable fielding position
-        region_names = {
-            "1": "Mid-wicket",
-            "2": "Mid-on",
-            "3": "Mid-off",
-            "4": "Cover",
-            "5": "Point",
-            "6": "Square leg"
-        }
+            result.warning("No valid region data found.")
+            return result
 
         best_region = max(region_runs.items(), key=lambda x: x[1])[0]
-        zone_name = region_names.get(best_region, f"Region {best_region}")
+        zone_name = REGION_NAMES.get(best_region, f"Region {best_region}")
         zone_runs = region_runs[best_region]
-        productive_bowler = bowler_type_counter.most_common(1)[0][0]
+        productive_bowler = max(bowling_type_runs.items(), key=lambda x: x[1])[0]
 
         summary = (
             f"🔍 The batsman has been most effective in the **{zone_name}** region, scoring **{zone_runs} runs** there. "
@@ -141,75 +114,66 @@ def summarize_player_wagon_wheel(data):
             f"so adjusting your attack strategy accordingly might reduce their impact."
         )
 
-        st.success(summary)
+        result.success(summary)
+        result.stats.update(region_runs=region_runs, bowling_type_runs=bowling_type_runs)
     except Exception as e:
-        st.error(f"❌ Error processing wagon wheel data: {e}")
-
-
-
-def summarize_shot_analysis_runs(data):
-    shots = data.get("shot_runs_graph_data", [])
-    if not shots:
-        st.warning("No shot analysis (runs) data found.")
-        return
-
-    top_shots = sorted(shots, key=lambda x: x["runs"], reverse=True)[:3]
-
-    lines = [f"🏏 The batsman’s most productive shot is **{top_shots[0]['shot_name']}**, fetching **{top_shots[0]['runs']} runs**."]
-    if len(top_shots) > 1:
-        for shot in top_shots[1:]:
-            lines.append(f"• They’ve also done well with the **{shot['shot_name']}** ({shot['runs']} runs).")
-
-    lines.append("🧠 Consider defending these areas heavily — they’re the batsman's strongest scoring options.")
-    st.success("\n".join(lines))
-
-import streamlit as st
-
-def summarize_shot_analysis_runs(data):
-    shots = data.get("shot_runs_graph_data", [])
-    if not shots:
-        st.warning("No shot analysis (runs) data found.")
-        return
-
-    # Sort by most runs scored from a shot
-    top_shots = sorted(shots, key=lambda x: x.get("runs", 0), reverse=True)[:3]
-
-    lines = [f"🏏 The batsman’s most productive shot is **{top_shots[0]['shot_name']}**, fetching **{top_shots[0]['runs']} runs**."]
+        result.error(f"❌ Error processing wagon wheel data: {e}")
+    return result
+
+
+def shot_analysis_runs_summary(data):
+    result = SummaryResult("player_shot_analysis_runs")
+    cube = as_player_cube(data)
+    if "shot_runs_graph_data" in cube.errors:
+        result.error(f"❌ Error processing shot analysis (runs) data: {cube.errors['shot_runs_graph_data']}")
+        return result
+    top_shots = cube.top_shots_by_runs(3)
+    if not top_shots:
+        result.warning("No shot analysis (runs) data found.")
+        return result
+
+    lines = [f"🏏 The batsman’s most productive shot is **{top_shots[0][0]}**, fetching **{top_shots[0][1]} runs**."]
     
     if len(top_shots) > 1:
-        for shot in top_shots[1:]:
-            lines.append(f"• They've also scored well with the **{shot['shot_name']}** ({shot['runs']} runs).")
+        for shot, runs in top_shots[1:]:
+            lines.append(f"• They've also scored well with the **{shot}** ({runs} runs).")
 
     lines.append("🧠 These shots define the batsman’s scoring style — protect those zones with deep fielders.")
-    st.success("\n".join(lines))
+    result.success("\n".join(lines))
+    result.stats["top_shots"] = [{"shot_name": shot, "runs": runs} for shot, runs in top_shots]
+    return result
 
-import streamlit as st
 
-def summarize_shot_analysis_outs(data):
-    shots = data.get("shot_outs_graph_data", [])
-    if not shots:
-        st.warning("No shot analysis (outs) data found.")
-        return
+def shot_analysis_outs_summary(data):
+    result = SummaryResult("player_shot_analysis_outs")
+    cube = as_player_cube(data)
+    if "shot_outs_graph_data" in cube.errors:
+        result.error(f"❌ Error processing shot analysis (outs) data: {cube.errors['shot_outs_graph_data']}")
+        return result
+    most_dismissed = cube.most_dismissed_shot()
+    if most_dismissed is None:
+        result.warning("No shot analysis (outs) data found.")
+        return result
 
-    most_dismissed = max(shots, key=lambda x: x["outs"])
-    shot = most_dismissed["shot_name"]
-    outs = most_dismissed["outs"]
+    shot, outs = most_dismissed
 
     summary = (
         f"🚨 The batsman has been dismissed most often while playing the **{shot}**, getting out **{outs} times**.\n\n"
         f"🧠 Consider encouraging this shot with specific field placements or slower deliveries — it's their weak spot."
     )
-    st.success(summary)
+    result.success(summary)
+    result.stats.update(shot_name=shot, outs=outs)
+    return result
 
-import streamlit as st
 
-def summarize_batting_position(data):
+def batting_position_summary(data):
+    result = SummaryResult("player_position")
     graph = data.get("batting_position_graph_data", {}).get("all", [])
     statements = {s["text"]: s["value"] for s in data.get("statements", [])}
 
     if not graph:
-        st.warning("No batting position data found.")
-        return
+        result.warning("No batting position data found.")
+        return result
 
     # Find best actual performance by runs
     top_by_runs = max(graph, key=lambda x: x.get("runs", 0))
@@ -234,15 +198,17 @@ def summarize_batting_position(data):
             f"followed by **#{pref_2}**. These likely match the batsman's comfort and success rate."
         )
 
-    st.success(summary.strip())
+    result.success(summary.strip())
+    result.stats.update(position=top_position, runs=runs, average=avg, strike_rate=sr, innings=innings)
+    return result
 
-import streamlit as st
 
-def summarize_vs_bowling_type(data):
+def vs_bowling_type_summary(data):
+    result = SummaryResult("player_vs_bowling")
     rows = data.get("graph_data", [])
     if not rows:
-        st.warning("No data found for bowling type performance.")
-        return
+        result.warning("No data found for bowling type performance.")
+        return result
 
     # Convert string values to floats
     for r in rows:
@@ -261,26 +227,28 @@ def summarize_vs_bowling_type(data):
         f"where their dismissal rate is **{weak_type['wk']}%** — the highest among all bowling types."
     )
 
-    st.success(summary)
-
-import streamlit as st
+    result.success(summary)
+    result.stats.update(best_type=best_type["bowling_type"], weak_type=weak_type["bowling_type"])
+    return result
 
-def summarize_player_run_types(data):
-    rows = data.get("types_of_runs_graph_data", [])
-    if not rows:
-        st.warning("No types of runs data found.")
-        return
 
-    # Filter out empty bowling types
-    valid_rows = [r for r in rows if r.get("bowling_type_name") and r.get("total_runs", 0) > 0]
+def player_run_types_summary(data):
+    result = SummaryResult("player_run_types")
+    cube = as_player_cube(data)
+    if "types_of_runs_graph_data" in cube.errors:
+        result.error(f"❌ Error processing types of runs data: {cube.errors['types_of_runs_graph_data']}")
+        return result
+    if not len(cube.run_types_order):
+        result.warning("No types of runs data found.")
+        return result
 
     # Most dot balls (pressure bowling)
-    dotty = max(valid_rows, key=lambda r: r.get("dot_balls", 0))
+    dotty = cube.run_type_leader("dot_balls")
     dot_type = dotty["bowling_type_name"]
     dot_rate = dotty["per_dot_balls"]
 
     # Most boundary runs (aggressive scoring)
-    boundary = max(valid_rows, key=lambda r: r.get("boundaries_run", 0))
+    boundary = cube.run_type_leader("boundaries_run")
     b_type = boundary["bowling_type_name"]
     b_runs = boundary["boundaries_run"]
     b_total = boundary["total_runs"]
@@ -294,4 +262,17 @@ def summarize_player_run_types(data):
         f"📌 Consider using {dot_type} options early to build pressure, then rotate away from {b_type} when they're set."
     )
 
-    st.success(summary)
+    result.success(summary)
+    result.stats.update(dot_type=dot_type, dot_rate=dot_rate, boundary_type=b_type,
+                        boundary_runs=b_runs, boundary_pct=boundary_pct)
+    return result
+
+
+summarize_player_current_form = streamlit_adapter(player_current_form_summary)
+summarize_player_playing_style = streamlit_adapter(player_playing_style_summary)
+summarize_player_wagon_wheel = streamlit_adapter(player_wagon_wheel_summary)
+summarize_shot_analysis_runs = streamlit_adapter(shot_analysis_runs_summary)
+summarize_shot_analysis_outs = streamlit_adapter(shot_analysis_outs_summary)
+summarize_batting_position = streamlit_adapter(batting_position_summary)
+summarize_vs_bowling_type = streamlit_adapter(vs_bowling_type_summary)
+summarize_player_run_types = streamlit_adapter(player_run_types_summary)
@@ -0,0 +1,86 @@
+from insights.metrics import timed
+
+
+# Fractions of the chart that usually hold the title and the axis labels.
+TITLE_REGION = 0.18
+X_AXIS_REGION = 0.12
+Y_AXIS_REGION = 0.10
+
+# Tesseract reads labels fine at this width; 4K screenshots are mostly
+# wasted pixels for keyword detection.
+MAX_STRIP_WIDTH = 1600
+STRIP_GAP = 12
+
+
+def otsu_threshold(gray):
+    histogram = gray.histogram()
+    total = sum(histogram)
+    total_sum = sum(i * count for i, count in enumerate(histogram))
+
+    best_threshold, best_variance = 127, 0.0
+    weight_bg, sum_bg = 0, 0
+    for level, count in enumerate(histogram):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += level * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (total_sum - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = level, variance
+    return best_threshold
+
+
+def binarize(image):
+    gray = image.convert("L")
+    threshold = otsu_threshold(gray)
+    binary = gray.point(lambda p: 255 if p > threshold else 0)
+
+    # Dark-themed dashboards come out as light text on black; flip them so
+    # tesseract always sees dark text on a light background.
+    histogram = binary.histogram()
+    if histogram[0] > histogram[255]:
+        binary = binary.point(lambda p: 255 - p)
+    return binary
+
+
+def downscale(image, max_width=MAX_STRIP_WIDTH):
+    if image.width <= max_width:
+        return image
+    from PIL import Image
+
+    height = max(1, round(image.height * max_width / image.width))
+    return image.resize((max_width, height), Image.BILINEAR)
+
+
+def title_strips(image):
+    width, height = image.size
+    strips = [
+        image.crop((0, 0, width, max(1, int(height * TITLE_REGION)))),
+        image.crop((0, height - max(1, int(height * X_AXIS_REGION)), width, height)),
+        # Y-axis labels run bottom-to-top; rotate them to read left-to-right.
+        image.crop((0, 0, max(1, int(width * Y_AXIS_REGION)), height)).rotate(-90, expand=True),
+    ]
+    return [binarize(downscale(strip)) for strip in strips]
+
+
+@timed("preprocess")
+def title_strip_image(image):
+    # Stack the strips on one white canvas so tesseract is called once for
+    # all of them instead of once per strip.
+    strips = title_strips(image)
+    width = max(strip.width for strip in strips)
+    height = sum(strip.height for strip in strips) + STRIP_GAP * (len(strips) - 1)
+
+    from PIL import Image
+
+    canvas = Image.new("L", (width, height), 255)
+    top = 0
+    for strip in strips:
+        canvas.paste(strip, (0, top))
+        top += strip.height + STRIP_GAP
+    return canvas
@@ -0,0 +1,78 @@
+from insights.metrics import stage
+from insights.render import render_summary
+
+from insights.match_insights import (
+    manhattan_summary,
+    worm_summary,
+    run_rate_summary,
+    wickets_pie_summary,
+    partnership_summary,
+    types_of_runs_summary,
+)
+
+from insights.player_insights import (
+    player_current_form_summary,
+    player_playing_style_summary,
+    shot_analysis_runs_summary,
+    shot_analysis_outs_summary,
+    player_wagon_wheel_summary,
+    batting_position_summary,
+    player_run_types_summary,
+    vs_bowling_type_summary,
+)
+
+from insights.team_insights import (
+    team_current_form_summary,
+    team_toss_insights_summary,
+)
+
+
+SUMMARIZERS = {
+    "match": {
+        "Manhattan": manhattan_summary,
+        "Worm": worm_summary,
+        "Run Rate": run_rate_summary,
+        "Wickets Pie": wickets_pie_summary,
+        "Partnership": partnership_summary,
+        "Types of Runs": types_of_runs_summary,
+    },
+    "player": {
+        "player_current_form": player_current_form_summary,
+        "player_playing_style": player_playing_style_summary,
+        "player_wagon_wheel": player_wagon_wheel_summary,
+        "player_shot_analysis_runs": shot_analysis_runs_summary,
+        "player_shot_analysis_outs": shot_analysis_outs_summary,
+        "player_position": batting_position_summary,
+        "player_vs_bowling": vs_bowling_type_summary,
+        "player_run_types": player_run_types_summary,
+    },
+    "team": {
+        "team_current_form": team_current_form_summary,
+        "team_toss_insights": team_toss_insights_summary,
+    },
+}
+
+
+def get_summarizer(category, graph_type):
+    return SUMMARIZERS.get(category, {}).get(graph_type)
+
+
+def build_summary(category, graph_type, data):
+    """Compute the SummaryResult for a graph, or None if it has no summarizer.
+
+    Match uploads are the raw match JSON (or its aggregates); player and
+    team uploads wrap their payload under "data".
+    """
+    summarizer = get_summarizer(category, graph_type)
+    if summarizer is None:
+        return None
+    with stage("summarize", graph_type=graph_type):
+        return summarizer(data if category == "match" else data["data"])
+
+
+def summarize_graph(category, graph_type, data):
+    result = build_summary(category, graph_type, data)
+    if result is None:
+        return False
+    render_summary(result)
+    return True
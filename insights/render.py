@@ -0,0 +1,19 @@
+def render_summary(result):
+    # The only place the insights package touches streamlit, imported here so
+    # headless callers never load it.
+    import streamlit as st
+
+    for message in result.messages:
+        getattr(st, message.level)(message.text)
+    return result
+
+
+def streamlit_adapter(build):
+    # Wraps a pure `*_summary` builder into the old `summarize_*` call that
+    # renders straight into the page.
+    def summarize(data):
+        return render_summary(build(data))
+
+    summarize.__name__ = "summarize_" + build.__name__[:-len("_summary")]
+    summarize.__doc__ = f"Render {build.__name__}() with streamlit."
+    return summarize
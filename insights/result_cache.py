@@ -0,0 +1,203 @@
+"""Finished summaries shared across sessions and processes through SQLite.
+
+Entries are keyed by the uploaded bytes (image and JSON, hashed) and the
+engine version, so a repeat upload is answered without OCR, JSON parsing
+or summarizing. The database runs in WAL mode with a busy timeout and each
+thread and process opens its own connection, so several Streamlit or
+service workers can share one file.
+
+The cache is off unless RESULT_CACHE_PATH names its file: cached results
+are served as they are, so the file belongs somewhere only this user can
+write, not a shared temp directory.
+
+    RESULT_CACHE_PATH       database file; unset or empty disables the cache
+    RESULT_CACHE_TTL        seconds an entry stays valid (default: 1 day)
+    RESULT_CACHE_MAX_BYTES  payload bytes kept before the least recently
+                            used entries go (default: 256 MiB)
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from insights.summary import ENGINE_VERSION
+
+
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+BUSY_TIMEOUT = 5.0
+# Hits refresh an entry's LRU timestamp at most this often, so reads do not
+# all queue up behind the write lock.
+TOUCH_INTERVAL = 60.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    image_hash TEXT NOT NULL,
+    json_hash TEXT NOT NULL,
+    engine TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    PRIMARY KEY (image_hash, json_hash, engine)
+);
+CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed);
+"""
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest() if data is not None else "-"
+
+
+class ResultCache:
+    def __init__(self, path, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, engine=ENGINE_VERSION):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.engine = engine
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    @classmethod
+    def from_env(cls):
+        path = os.environ.get("RESULT_CACHE_PATH") or None
+        ttl = float(os.environ.get("RESULT_CACHE_TTL", DEFAULT_TTL))
+        max_bytes = int(os.environ.get("RESULT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES))
+        return cls(path, ttl=ttl, max_bytes=max_bytes)
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def _connection(self):
+        # One connection per thread, reopened after a fork: sqlite handles
+        # must not cross either boundary.
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT * 1000)}")
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def get(self, image_bytes, json_bytes):
+        if not self.enabled:
+            return None
+        key = (content_hash(image_bytes), content_hash(json_bytes), self.engine)
+        now = time.time()
+        try:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT payload, created, accessed FROM results"
+                " WHERE image_hash = ? AND json_hash = ? AND engine = ?", key,
+            ).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM results WHERE image_hash = ? AND json_hash = ? AND engine = ?", key)
+                self._count("expired")
+                row = None
+            if row is not None:
+                if now - row[2] > TOUCH_INTERVAL:
+                    conn.execute(
+                        "UPDATE results SET accessed = ? WHERE image_hash = ? AND json_hash = ? AND engine = ?",
+                        (now, *key),
+                    )
+                self._count("hits")
+                return json.loads(row[0])
+        except sqlite3.Error as e:
+            print("Result cache read failed:", e)
+        self._count("misses")
+        return None
+
+    def put(self, image_bytes, json_bytes, payload):
+        if not self.enabled:
+            return
+        encoded = json.dumps(payload, ensure_ascii=False)
+        now = time.time()
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (content_hash(image_bytes), content_hash(json_bytes), self.engine, encoded, len(encoded), now, now),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            print("Result cache write failed:", e)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so concurrent
+        # writers wait on busy_timeout instead of failing mid-transaction.
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _evict(self, conn, now):
+        # Drops expired entries, then the least recently used ones until the
+        # payloads fit max_bytes. Other engine versions' entries are left to
+        # the same rules: workers on an older or newer version may still be
+        # sharing the file.
+        conn.execute("DELETE FROM results WHERE created < ?", (now - self.ttl,))
+        excess = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        doomed = []
+        for rowid, size in conn.execute("SELECT rowid, size FROM results ORDER BY accessed"):
+            doomed.append((rowid,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM results WHERE rowid = ?", doomed)
+
+    def evict(self):
+        if self.enabled:
+            with self._transaction() as conn:
+                self._evict(conn, time.time())
+
+    def clear(self):
+        if self.enabled:
+            self._connection().execute("DELETE FROM results")
+
+    def stats(self):
+        entries, size = 0, 0
+        if self.enabled:
+            try:
+                entries, size = self._connection().execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+            except sqlite3.Error as e:
+                print("Result cache read failed:", e)
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": entries,
+                "bytes": size,
+            }
+
+
+RESULT_CACHE = ResultCache.from_env()
+
+
+def result_cache_stats():
+    return RESULT_CACHE.stats()
@@ -0,0 +1,121 @@
+import re
+from collections import namedtuple
+
+
+Rule = namedtuple("Rule", ["keywords", "category", "graph_type", "weight", "context"])
+
+
+def rule(category, graph_type, *keywords, weight=1.0, context=False):
+    return Rule(keywords, category, graph_type, weight, context)
+
+
+# Declarative detection table. Earlier rules win ties, which keeps the
+# precedence the old if/elif chains had. Context rules only add to a graph
+# type that already has a primary keyword hit.
+RULES = [
+    rule("match", "Types of Runs", "type of runs"),
+    rule("player", "player_run_types", "types of runs"),
+
+    rule("team", "team_current_form", "current form"),
+    rule("player", "player_current_form", "current form"),
+    rule("player", "player_current_form", "score", "out type", context=True),
+
+    rule("match", "Run Rate", "run rate", "runrate", "rr", "rpo"),
+    rule("match", "Manhattan", "manhattan", "runs per over", "run distribution", "per over runs"),
+    rule("match", "Worm", "worm", "cumulative runs", "cumulative", "score progress"),
+    rule("match", "Wickets Pie", "wickets pie", "dismissals", "dismissal type", "fall of wicket"),
+    rule("match", "Partnership", "partnership", "partnerships"),
+
+    rule("player", "player_shot_analysis", "shot analysis", "shots analysis"),
+    rule("player", "player_playing_style", "playing style"),
+    rule("player", "player_wagon_wheel", "wagon wheel"),
+    rule("player", "player_position", "batting position"),
+    rule("player", "player_vs_bowling", "bowling type"),
+
+    rule("team", "team_toss_insights", "toss insights", "win toss", "bat first", "field first"),
+]
+
+# Words that are only counted, to split shot analysis into runs vs outs.
+COUNTERS = {
+    "run": "runs",
+    "runs": "runs",
+    "out": "outs",
+    "outs": "outs",
+    "wickets": "outs",
+}
+
+
+Classification = namedtuple("Classification", ["category", "graph_type", "score", "ranking"])
+
+
+class RuleMatcher:
+    """All rule keywords compiled into one regex, so text is scanned once."""
+
+    def __init__(self, rules, counters):
+        self.rules = rules
+        self.counters = counters
+        self._targets = {}
+        for priority, r in enumerate(rules):
+            for kw in r.keywords:
+                self._targets.setdefault(kw, []).append(priority)
+
+        # Longest alternatives first so "run rate" beats "run", and word
+        # boundaries so "rr" no longer matches inside "current".
+        words = sorted(set(self._targets) | set(counters), key=len, reverse=True)
+        alternation = "|".join(re.escape(w).replace(r"\ ", r"\s+") for w in words)
+        self._pattern = re.compile(rf"\b(?:{alternation})\b", re.IGNORECASE)
+
+    def scan(self, text):
+        keywords, counts = set(), {}
+        for m in self._pattern.finditer(text):
+            word = " ".join(m.group().lower().split())
+            if word in self._targets:
+                keywords.add(word)
+            else:
+                counter = self.counters[word]
+                counts[counter] = counts.get(counter, 0) + 1
+        return keywords, counts
+
+    def classify(self, text, category=None):
+        keywords, counts = self.scan(text)
+
+        primary, context = {}, {}
+        for kw in keywords:
+            for priority in self._targets[kw]:
+                r = self.rules[priority]
+                if category is not None and r.category != category:
+                    continue
+                target = (r.category, r.graph_type)
+                bucket = context if r.context else primary
+                score, first = bucket.get(target, (0.0, priority))
+                bucket[target] = (score + r.weight, min(first, priority))
+
+        ranking = []
+        for target, (score, priority) in primary.items():
+            score += context.get(target, (0.0, priority))[0]
+            ranking.append((target[0], self._refine(target[1], counts), score, priority))
+        if not ranking:
+            return None
+
+        # Highest score first; rule order breaks ties deterministically.
+        ranking.sort(key=lambda x: (-x[2], x[3]))
+        best = ranking[0]
+        return Classification(best[0], best[1], best[2], [(c, g, s) for c, g, s, _ in ranking])
+
+    @staticmethod
+    def _refine(graph_type, counts):
+        if graph_type != "player_shot_analysis":
+            return graph_type
+        runs, outs = counts.get("runs", 0), counts.get("outs", 0)
+        if runs > outs:
+            return "player_shot_analysis_runs"
+        elif outs > runs:
+            return "player_shot_analysis_outs"
+        return "player_shot_analysis_unknown"
+
+
+MATCHER = RuleMatcher(RULES, COUNTERS)
+
+
+def classify_text(text, category=None):
+    return MATCHER.classify(text, category)
@@ -0,0 +1,53 @@
+"""Tell the graph from an uploaded JSON payload's keys, without OCR.
+
+Player uploads carry their series under a graph-specific key, and the team
+and bowling-type payloads put a recognisable row shape under
+``graph_data``. When exactly one graph matches, OCR can be skipped. Match
+files fit all six match graphs, and payloads bundling several series are
+ambiguous, so both are left to OCR.
+"""
+
+PLAYER_KEYS = {
+    "current_form_graph_data": "player_current_form",
+    "playing_style_graph_data": "player_playing_style",
+    "wagon_wheel_graph_data": "player_wagon_wheel",
+    "shot_runs_graph_data": "player_shot_analysis_runs",
+    "shot_outs_graph_data": "player_shot_analysis_outs",
+    "batting_position_graph_data": "player_position",
+    "types_of_runs_graph_data": "player_run_types",
+}
+
+# Field names that identify the payload shapes sharing the "graph_data" key.
+TOSS_FIELDS = ("won_toss", "lost_toss", "bat_first", "field_first")
+FORM_FIELDS = ("match_result", "won_team_id")
+BOWLING_FIELDS = ("bowling_type",)
+
+
+def _graph_data_type(graph_data):
+    if isinstance(graph_data, dict):
+        if any(field in graph_data for field in TOSS_FIELDS):
+            return "team", "team_toss_insights"
+        return None
+    if not isinstance(graph_data, list) or not graph_data or not isinstance(graph_data[0], dict):
+        return None
+    row = graph_data[0]
+    if any(field in row for field in BOWLING_FIELDS):
+        return "player", "player_vs_bowling"
+    if any(field in row for field in FORM_FIELDS):
+        return "team", "team_current_form"
+    return None
+
+
+def detect_graph_from_json(document):
+    """Return ``(category, graph_type)`` if the payload names exactly one graph, else None."""
+    payload = document.get("data") if isinstance(document, dict) else None
+    if not isinstance(payload, dict):
+        return None
+
+    found = [("player", graph_type) for key, graph_type in PLAYER_KEYS.items() if key in payload]
+    if "graph_data" in payload:
+        shape = _graph_data_type(payload["graph_data"])
+        if shape is None:
+            return None
+        found.append(shape)
+    return found[0] if len(found) == 1 else None
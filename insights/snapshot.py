@@ -0,0 +1,219 @@
+"""Versioned binary snapshots of an upload's derived aggregates.
+
+    python -m insights.snapshot export MATCH.json OUT.snap
+    python -m insights.snapshot info OUT.snap
+
+A snapshot holds what the summaries read instead of the raw upload: a
+match's MatchAggregates (runs per over, run types, wicket kinds,
+partnerships; the worm and run rates are cumulative sums of the overs)
+or a player payload's PlayerCube, plus the rest of the document. Loading
+one skips JSON parsing and aggregation entirely, and the app, explain()
+and batch mode accept it wherever they accept the JSON.
+
+Layout: ``MAGIC``, a little-endian uint32 header length, a JSON header
+(format and engine version, labels, small dicts, the document and each
+array's dtype/shape/offset), then the arrays as raw little-endian data,
+each aligned to ``ALIGN`` bytes. A snapshot on disk is read with
+``np.memmap`` and an in-memory upload with ``np.frombuffer``, so arrays
+are views into the file rather than copies.
+"""
+import io
+import json
+import os
+import struct
+import sys
+
+import numpy as np
+
+from insights.match_aggregates import MatchAggregates
+from insights.player_cube import CUBE_SERIES, PLAYER_CUBE_KEY, RUN_TYPE_FIELDS, PlayerCube, as_player_cube
+from insights.stream import load_json_upload
+from insights.summary import ENGINE_VERSION
+
+
+MAGIC = b"CRKSNAP\x00"
+SNAPSHOT_VERSION = 3
+ALIGN = 64
+_LENGTH = struct.Struct("<I")
+
+def _match_parts(aggregates):
+    counts = np.array([len(overs) for overs in aggregates.over_runs], dtype=np.int64)
+    over_runs = (np.concatenate(aggregates.over_runs).astype(np.int64) if len(counts)
+                 else np.zeros(0, dtype=np.int64))
+    meta = {
+        "innings_teams": list(aggregates.innings_teams),
+        # Lists of pairs keep the dicts' first-seen order.
+        "wicket_counts": [[kind, int(n)] for kind, n in aggregates.wicket_counts.items()],
+        "partnerships": [[list(pair), int(runs)] for pair, runs in aggregates.partnerships.items()],
+    }
+    arrays = {"over_counts": counts, "over_runs": over_runs, "run_types": np.asarray(aggregates.run_types)}
+    return meta, arrays
+
+
+def _cube_parts(cube):
+    meta = {
+        "regions": cube.regions,
+        "bowling_types": cube.bowling_types,
+        "shots": cube.shots,
+        "run_values": cube.run_values,
+        "errors": {series: str(e) for series, e in cube.errors.items()},
+    }
+    arrays = {
+        "balls": cube.balls,
+        "shot_runs": cube.shot_runs,
+        "shot_runs_order": cube.shot_runs_order,
+        "shot_outs": cube.shot_outs,
+        "shot_outs_order": cube.shot_outs_order,
+        "run_types_order": cube.run_types_order,
+        **{"run_types." + field: cube.run_types[field] for field in RUN_TYPE_FIELDS},
+    }
+    return meta, arrays
+
+
+def _padding(offset):
+    return -offset % ALIGN
+
+
+def write_snapshot(fp, document, aggregates=None):
+    """Write the snapshot of an upload, as returned by load_json_upload()."""
+    header = {"version": SNAPSHOT_VERSION, "engine": ENGINE_VERSION, "match": None, "cube": None}
+    arrays = {}
+    if aggregates is not None:
+        header["match"], match_arrays = _match_parts(aggregates)
+        arrays.update(("match." + k, v) for k, v in match_arrays.items())
+
+    payload = document.get("data") if isinstance(document, dict) else None
+    if isinstance(payload, dict) and any(key in payload for key in CUBE_SERIES):
+        cube = as_player_cube(payload)
+        header["cube"], cube_arrays = _cube_parts(cube)
+        arrays.update(("cube." + k, v) for k, v in cube_arrays.items())
+        # The document keeps the series' keys (empty) so schema detection
+        # still sees which graphs the payload carried.
+        payload = {k: [] if k in CUBE_SERIES else v for k, v in payload.items() if k != PLAYER_CUBE_KEY}
+        document = dict(document, data=payload)
+    header["document"] = document
+
+    # Offsets depend on the header's length and the header lists the
+    # offsets, so lay the arrays out after a header sized with room to spare.
+    arrays = {name: np.ascontiguousarray(a, dtype=np.asarray(a).dtype.newbyteorder("<")) for name, a in arrays.items()}
+    header["arrays"] = {name: [a.dtype.str, list(a.shape), 0] for name, a in arrays.items()}
+    reserved = len(json.dumps(header).encode("utf-8")) + 32 * len(arrays) + 64
+    offset = len(MAGIC) + _LENGTH.size + reserved
+    for name, a in arrays.items():
+        offset += _padding(offset)
+        header["arrays"][name][2] = offset
+        offset += a.nbytes
+    encoded = json.dumps(header).encode("utf-8").ljust(reserved)
+
+    fp.write(MAGIC)
+    fp.write(_LENGTH.pack(len(encoded)))
+    fp.write(encoded)
+    written = len(MAGIC) + _LENGTH.size + len(encoded)
+    for name, a in arrays.items():
+        fp.write(b"\0" * _padding(written))
+        written += _padding(written)
+        fp.write(a.tobytes())
+        written += a.nbytes
+
+
+def dump_snapshot(document, aggregates=None):
+    buffer = io.BytesIO()
+    write_snapshot(buffer, document, aggregates)
+    return buffer.getvalue()
+
+
+def is_snapshot(data):
+    return bytes(data[:len(MAGIC)]) == MAGIC
+
+
+def load_snapshot(source):
+    """Read a snapshot into ``(document, aggregates)``, like load_json_upload().
+
+    ``source`` is a path (memory-mapped), bytes or a binary file object.
+    Player documents come back with their PlayerCube under
+    ``data[PLAYER_CUBE_KEY]``, where the player summaries pick it up.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        buffer = np.memmap(source, dtype=np.uint8, mode="r")
+    else:
+        buffer = np.frombuffer(source if isinstance(source, (bytes, bytearray, memoryview)) else source.read(),
+                               dtype=np.uint8)
+    start = len(MAGIC) + _LENGTH.size
+    if len(buffer) < start or not is_snapshot(buffer):
+        raise ValueError("Not a snapshot file")
+    (length,) = _LENGTH.unpack(bytes(buffer[len(MAGIC):start]))
+    header = json.loads(bytes(buffer[start:start + length]).decode("utf-8"))
+    if header.get("version") != SNAPSHOT_VERSION:
+        raise ValueError(f"Snapshot format version {header.get('version')}, expected {SNAPSHOT_VERSION}")
+    if header.get("engine") != ENGINE_VERSION:
+        raise ValueError(f"Snapshot made by engine version {header.get('engine')}, "
+                         f"this is {ENGINE_VERSION}; export it again")
+
+    arrays = {}
+    for name, (dtype, shape, offset) in header["arrays"].items():
+        dtype = np.dtype(dtype)
+        size = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        arrays[name] = buffer[offset:offset + size].view(dtype).reshape(shape)
+
+    aggregates = None
+    match = header["match"]
+    if match is not None:
+        counts = arrays["match.over_counts"]
+        aggregates = MatchAggregates(
+            match["innings_teams"],
+            np.split(arrays["match.over_runs"], np.cumsum(counts)[:-1]) if len(counts) else [],
+            arrays["match.run_types"],
+            {kind: n for kind, n in match["wicket_counts"]},
+            {tuple(pair): runs for pair, runs in match["partnerships"]},
+        )
+
+    document = header["document"]
+    labels = header["cube"]
+    if labels is not None:
+        cube = PlayerCube(
+            labels["regions"], labels["bowling_types"], labels["shots"], labels["run_values"], arrays["cube.balls"],
+            arrays["cube.shot_runs"], arrays["cube.shot_runs_order"],
+            arrays["cube.shot_outs"], arrays["cube.shot_outs_order"],
+            {field: arrays["cube.run_types." + field] for field in RUN_TYPE_FIELDS}, arrays["cube.run_types_order"],
+        )
+        cube.errors = {series: ValueError(message) for series, message in labels["errors"].items()}
+        document["data"][PLAYER_CUBE_KEY] = cube
+    return document, aggregates
+
+
+def load_upload(fp):
+    """load_json_upload() that also takes a snapshot, told apart by its magic bytes."""
+    head = fp.read(len(MAGIC))
+    fp.seek(0)
+    if is_snapshot(head):
+        return load_snapshot(fp)
+    return load_json_upload(fp)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) == 3 and argv[0] == "export":
+        with open(argv[1], "rb") as f:
+            document, aggregates = load_json_upload(f)
+        with open(argv[2], "wb") as f:
+            write_snapshot(f, document, aggregates)
+        print(f"wrote {argv[2]} ({os.path.getsize(argv[2])} bytes)")
+        return 0
+    if len(argv) == 2 and argv[0] == "info":
+        try:
+            document, aggregates = load_snapshot(argv[1])
+        except (OSError, ValueError) as e:
+            print(f"{argv[1]}: {e}", file=sys.stderr)
+            return 1
+        payload = document.get("data") if isinstance(document, dict) else None
+        print(aggregates if aggregates is not None else "no match aggregates")
+        print(payload.get(PLAYER_CUBE_KEY) if isinstance(payload, dict) and PLAYER_CUBE_KEY in payload
+              else "no player cube")
+        return 0
+    print("usage: python -m insights.snapshot export MATCH.json OUT.snap", file=sys.stderr)
+    print("       python -m insights.snapshot info SNAPSHOT.snap", file=sys.stderr)
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
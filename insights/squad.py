@@ -0,0 +1,335 @@
+"""Compare many players at once from their player payloads.
+
+    python -m insights.squad players/*.json --sort strike_rate --top 10
+
+Each player's uploads (current form, vs bowling type, types of runs) are
+stacked into flat arrays with a player code per row, so form, average,
+strike rate, dismissal mix and per-bowling-type splits come out of a few
+bincounts for the whole squad instead of one summarizer call per player.
+The numbers follow the single-player summaries in ``insights.player_insights``.
+"""
+import json
+import os
+import sys
+
+import numpy as np
+
+from insights.deliveries import interned
+
+
+# Innings counted by the "recent" columns.
+FORM_WINDOW = 5
+
+
+def _payload_data(payload):
+    return payload.get("data", payload) if isinstance(payload, dict) else {}
+
+
+def _first_best(values, rows, order):
+    # Per row of the matrix, the column with the largest value; ties go to
+    # the column seen first in that player's own payload (``order``), like
+    # ``max`` over the payload rows does. NaN cells never win.
+    if values.shape[1] == 0:
+        return np.full(len(values), -1, dtype=np.int64)
+    score = np.where(np.isnan(values), -np.inf, values)
+    best = score.max(axis=1, keepdims=True)
+    first = np.where(score == best, order, np.iinfo(np.int64).max)
+    choice = first.argmin(axis=1)
+    return np.where(np.isfinite(best[:, 0]) & rows, choice, -1)
+
+
+class SquadBuilder:
+    def __init__(self):
+        self.players = {}
+        self.dismissal_kinds = {}
+        self.bowling_types = {}
+        self.run_bowling_types = {}
+        self._form = ([], [], [], [], [])  # player, runs, balls, is_out, kind
+        self._bowling = ([], [], [], [], [])  # player, type, avg, sr, wk
+        self._run_types = ([], [], [], [], [], [])  # player, type, total, dots, dot %, boundaries
+
+    def add(self, name, payload):
+        """Add one upload (form, vs-bowling or types-of-runs) for a player.
+
+        The whole upload is read and checked before anything is added, so
+        a malformed one raises (KeyError, ValueError, TypeError or
+        AttributeError) and leaves the builder as it was.
+        """
+        data = _payload_data(payload)
+
+        form = []
+        for m in data.get("current_form_graph_data", []):
+            out = m.get("is_out", 0) == 1
+            form.append((int(m["runs"]), int(m["balls"]), out, m["out_type"] if out and m.get("out_type") else None))
+
+        bowling = []
+        graph_data = data.get("graph_data")
+        if isinstance(graph_data, list):
+            for r in (row for row in graph_data if "bowling_type" in row):
+                bowling.append((r["bowling_type"], float(r.get("average", 0)), float(r.get("strike_rate", 0)),
+                                float(r.get("wicket", "0").replace("%", ""))))
+
+        run_types = []
+        for r in data.get("types_of_runs_graph_data", []):
+            if r.get("bowling_type_name") and r.get("total_runs", 0) > 0:
+                run_types.append((r["bowling_type_name"], float(r["total_runs"]), float(r.get("dot_balls", 0)),
+                                  float(r.get("per_dot_balls", 0)), float(r.get("boundaries_run", 0))))
+
+        # Names and labels become dict keys below; an unhashable one fails here.
+        hash((name, tuple(f[3] for f in form), tuple(r[0] for r in bowling), tuple(r[0] for r in run_types)))
+
+        p = interned(self.players, name)
+        player, runs, balls, is_out, kind = self._form
+        for r, b, out, out_type in form:
+            player.append(p)
+            runs.append(r)
+            balls.append(b)
+            is_out.append(out)
+            kind.append(-1 if out_type is None else interned(self.dismissal_kinds, out_type))
+
+        player, code, avg, sr, wk = self._bowling
+        for bowling_type, a, s, w in bowling:
+            player.append(p)
+            code.append(interned(self.bowling_types, bowling_type))
+            avg.append(a)
+            sr.append(s)
+            wk.append(w)
+
+        player, code, total, dots, dot_rate, boundaries = self._run_types
+        for bowling_type, t, d, rate, b in run_types:
+            player.append(p)
+            code.append(interned(self.run_bowling_types, bowling_type))
+            total.append(t)
+            dots.append(d)
+            dot_rate.append(rate)
+            boundaries.append(b)
+        return self
+
+    def build(self):
+        return Squad(self)
+
+
+def load_squad(players):
+    """Build a Squad from ``{name: payload or [payloads]}``."""
+    builder = SquadBuilder()
+    for name, payloads in players.items():
+        for payload in payloads if isinstance(payloads, list) else [payloads]:
+            builder.add(name, payload)
+    return builder.build()
+
+
+def _best_rows(n_players, player, values):
+    # Per player, the row max() over their payload rows returns: the largest
+    # value, ties to the row seen first. A bowling type listed twice (or a
+    # player uploaded twice) stays two rows, as it is for max(). -1 for
+    # players without a row; NaN values never win.
+    best = np.full(n_players, -1, dtype=np.int64)
+    rows = np.flatnonzero(~np.isnan(values))
+    if not len(rows):
+        return best
+    ranked = rows[np.lexsort((rows, -values[rows], player[rows]))]
+    first = np.concatenate([[True], player[ranked][1:] != player[ranked][:-1]])
+    best[player[ranked[first]]] = ranked[first]
+    return best
+
+
+def _pick(values, rows, fill=np.nan):
+    # values[rows], ``fill`` where the row is -1.
+    return np.append(values, fill)[rows]
+
+
+class Squad:
+    def __init__(self, builder):
+        self.names = list(builder.players)
+        self.dismissal_kinds = list(builder.dismissal_kinds)
+        self.bowling_types = list(builder.bowling_types)
+        self.run_bowling_types = list(builder.run_bowling_types)
+        n = len(self.names)
+
+        # Form rows are kept grouped by player, in upload order within each.
+        player, runs, balls, is_out, kind = (np.asarray(c) for c in builder._form)
+        grouped = np.argsort(player, kind="stable")
+        self.form_player = player[grouped].astype(np.int64)
+        self.form_runs = runs[grouped].astype(np.int64)
+        self.form_balls = balls[grouped].astype(np.int64)
+        self.form_is_out = is_out[grouped].astype(bool)
+        self.form_kind = kind[grouped].astype(np.int64)
+
+        # Vs-bowling and types-of-runs rows stay one per payload row, in
+        # upload order, so the per-player leaders can follow max() exactly.
+        player, code, avg, sr, wk = (np.asarray(c) for c in builder._bowling)
+        self.bowling_player = player.astype(np.int64)
+        self.bowling_code = code.astype(np.int64)
+        self.bowling_average = avg.astype(np.float64)
+        self.bowling_strike_rate = sr.astype(np.float64)
+        self.bowling_dismissal_rate = wk.astype(np.float64)
+
+        player, code, total, dots, dot_rate, boundaries = (np.asarray(c) for c in builder._run_types)
+        self.run_player = player.astype(np.int64)
+        self.run_code = code.astype(np.int64)
+        self.run_total = total.astype(np.float64)
+        self.run_dot_balls = dots.astype(np.float64)
+        self.run_dot_rate = dot_rate.astype(np.float64)
+        self.run_boundaries = boundaries.astype(np.float64)
+
+    def __len__(self):
+        return len(self.names)
+
+    def form(self):
+        n = len(self.names)
+        player = self.form_player
+        innings = np.bincount(player, minlength=n)
+        runs = np.bincount(player, weights=self.form_runs, minlength=n).astype(np.float64)
+        balls = np.bincount(player, weights=self.form_balls, minlength=n).astype(np.float64)
+        outs = np.bincount(player, weights=self.form_is_out, minlength=n).astype(np.float64)
+        average = np.divide(runs, outs, out=runs.copy(), where=outs > 0)
+        strike_rate = np.divide(runs * 100, balls, out=np.zeros(n), where=balls > 0)
+
+        # The first row of each player's top score is the one max() returns.
+        top_score = np.full(n, -1, dtype=np.int64)
+        np.maximum.at(top_score, player, self.form_runs)
+        is_top = self.form_runs == top_score[player]
+        top_row = np.full(n, len(player), dtype=np.int64)
+        np.minimum.at(top_row, player[is_top], np.flatnonzero(is_top))
+        top_balls = np.where(innings > 0, np.append(self.form_balls, 0)[top_row], 0)
+
+        # Mean runs over each player's last FORM_WINDOW innings.
+        position = np.arange(len(player))
+        from_end = np.repeat(np.cumsum(innings), innings) - position - 1
+        recent = from_end < FORM_WINDOW
+        recent_innings = np.bincount(player[recent], minlength=n)
+        recent_runs = np.bincount(player[recent], weights=self.form_runs[recent], minlength=n).astype(np.float64)
+        recent_average = np.divide(recent_runs, recent_innings, out=np.zeros(n), where=recent_innings > 0)
+
+        # Dismissal mix as an (players x kinds) count matrix.
+        k = len(self.dismissal_kinds)
+        dismissed = self.form_kind >= 0
+        flat = player[dismissed] * k + self.form_kind[dismissed]
+        dismissals = np.bincount(flat, minlength=n * k).reshape(n, k).astype(np.float64)
+        first_seen = np.full(n * k, np.inf)
+        np.minimum.at(first_seen, flat, np.flatnonzero(dismissed))
+        dismissals_or_nan = np.where(dismissals > 0, dismissals, np.nan)
+        common = _first_best(dismissals_or_nan, dismissals.sum(axis=1) > 0, first_seen.reshape(n, k))
+
+        return {
+            "innings": innings,
+            "runs": runs.astype(np.int64),
+            "balls": balls.astype(np.int64),
+            "outs": outs.astype(np.int64),
+            "average": average,
+            "strike_rate": strike_rate,
+            "top_score": np.where(innings > 0, top_score, 0),
+            "top_score_balls": top_balls,
+            "recent_average": recent_average,
+            "dismissals": dismissals.astype(np.int64),
+            "common_dismissal": common,
+        }
+
+    def vs_bowling(self):
+        n = len(self.names)
+        best = _best_rows(n, self.bowling_player, self.bowling_average)
+        weak = _best_rows(n, self.bowling_player, self.bowling_dismissal_rate)
+        return {
+            "best_type": _pick(self.bowling_code, best, -1),
+            "best_average": _pick(self.bowling_average, best),
+            "best_strike_rate": _pick(self.bowling_strike_rate, best),
+            "weak_type": _pick(self.bowling_code, weak, -1),
+            "weak_dismissal_rate": _pick(self.bowling_dismissal_rate, weak),
+        }
+
+    def run_types(self):
+        n = len(self.names)
+        dot = _best_rows(n, self.run_player, self.run_dot_balls)
+        boundary = _best_rows(n, self.run_player, self.run_boundaries)
+        b_runs = _pick(self.run_boundaries, boundary)
+        b_total = _pick(self.run_total, boundary)
+        return {
+            "dot_type": _pick(self.run_code, dot, -1),
+            "dot_rate": _pick(self.run_dot_rate, dot),
+            "boundary_type": _pick(self.run_code, boundary, -1),
+            "boundary_runs": b_runs,
+            "boundary_pct": np.divide(b_runs * 100, b_total, out=np.full(len(b_runs), np.nan), where=b_total > 0),
+        }
+
+    def compare(self, sort_by="average", descending=True, top=None, min_innings=0):
+        """Ranked comparison table: one JSON-ready dict per player."""
+        form, bowling, run_types = self.form(), self.vs_bowling(), self.run_types()
+        columns = {
+            **{k: v for k, v in form.items() if k not in ("dismissals", "common_dismissal")},
+            "common_dismissal": _labels(form["common_dismissal"], self.dismissal_kinds),
+            "best_vs": _labels(bowling["best_type"], self.bowling_types),
+            "best_vs_average": bowling["best_average"],
+            "weak_vs": _labels(bowling["weak_type"], self.bowling_types),
+            "weak_vs_dismissal_rate": bowling["weak_dismissal_rate"],
+            "dot_ball_type": _labels(run_types["dot_type"], self.run_bowling_types),
+            "dot_ball_rate": run_types["dot_rate"],
+            "boundary_type": _labels(run_types["boundary_type"], self.run_bowling_types),
+            "boundary_pct": run_types["boundary_pct"],
+        }
+        if sort_by not in columns or columns[sort_by].dtype == object:
+            raise ValueError(f"Cannot rank by {sort_by!r}")
+
+        keep = np.flatnonzero(form["innings"] >= min_innings)
+        key = np.nan_to_num(columns[sort_by][keep].astype(np.float64), nan=-np.inf)
+        order = keep[np.argsort(-key if descending else key, kind="stable")]
+        if top is not None:
+            order = order[:top]
+
+        table = []
+        for rank, i in enumerate(order, 1):
+            row = {"rank": rank, "player": self.names[i]}
+            for name, values in columns.items():
+                row[name] = _plain(values[i])
+            table.append(row)
+        return table
+
+
+def _labels(codes, names):
+    return np.array([names[c] if c >= 0 else None for c in codes], dtype=object)
+
+
+def _plain(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else round(float(value), 2)
+    return value
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sort_by, top, paths = "average", None, []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--sort":
+            sort_by = next(args, sort_by)
+        elif arg == "--top":
+            top = int(next(args, "0")) or None
+        else:
+            paths.append(arg)
+    if not paths:
+        print("usage: python -m insights.squad PLAYER.json [...] [--sort COLUMN] [--top N]", file=sys.stderr)
+        print("  files are grouped by player: the name is the file name up to its first dot", file=sys.stderr)
+        return 2
+
+    builder = SquadBuilder()
+    for path in paths:
+        name = os.path.basename(path).split(".", 1)[0]
+        try:
+            with open(path, encoding="utf-8") as f:
+                builder.add(name, json.load(f))
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            print(f"skipped {path}: {e}", file=sys.stderr)
+
+    try:
+        table = builder.build().compare(sort_by=sort_by, top=top)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    for row in table:
+        print(json.dumps(row, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,239 @@
+import codecs
+import json
+
+import numpy as np
+
+from insights.deliveries import DeliveryTableBuilder
+from insights.match_aggregates import aggregate_table, empty_aggregates
+from insights.metrics import timed
+from insights.player_cube import attach_player_cube
+
+
+READ_SIZE = 64 * 1024
+# Uploads up to this size are parsed whole with json.loads, several times
+# faster than the streaming reader; only larger ones are streamed.
+SMALL_UPLOAD_BYTES = 1024 * 1024
+CHUNK_DELIVERIES = 8192
+WHITESPACE = " \t\n\r"
+# Characters a number can go on with after raw_decode stopped short of them.
+NUMBER_TAIL = ".eE+-"
+
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    # Minimal incremental JSON reader: containers on the innings -> overs ->
+    # deliveries path are walked token by token, everything else is handed
+    # to json's raw_decode one value at a time.
+
+    def __init__(self, fp, read_size=READ_SIZE):
+        self.fp = fp
+        self.read_size = read_size
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def _fill(self, size=None):
+        if self.eof:
+            return False
+        # A read can end inside a multi-byte character or hold only the BOM,
+        # which decodes to nothing; only an empty read is the end of input.
+        text = ""
+        while not text:
+            chunk = self.fp.read(size or self.read_size)
+            if not chunk:
+                if isinstance(chunk, bytes):
+                    self._utf8.decode(b"", final=True)
+                self.eof = True
+                return False
+            text = self._utf8.decode(chunk) if isinstance(chunk, bytes) else chunk
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON input")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} but found {found!r}")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # Incomplete value: read at least as much again as we hold,
+                # so a large value costs linear rather than quadratic time.
+                if self._fill(max(self.read_size, len(self.buf))):
+                    continue
+                raise
+            tail = self.buf[end:end + 3]
+            if (isinstance(value, (int, float)) and len(tail) <= 2 and all(c in NUMBER_TAIL for c in tail)
+                    and self._fill()):
+                # A number at the end of the buffer may continue in the next
+                # chunk, even if the scan stopped on a "." or an exponent.
+                continue
+            self.pos = end
+            return value
+
+    def _close(self, closing):
+        char = self.peek()
+        self.pos += 1
+        if char == closing:
+            return True
+        if char != ",":
+            raise ValueError(f"Expected ',' or {closing!r} but found {char!r}")
+        return False
+
+    def iter_object(self):
+        # Yields each key; the caller must consume the value before resuming.
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self._close("}"):
+                return
+
+    def iter_array(self):
+        # Yields once per element; the caller must consume it before resuming.
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield
+            if self._close("]"):
+                return
+
+
+class MatchStream:
+    """Iterate a match JSON file delivery by delivery.
+
+    Yields ``(innings, over, ball, delivery)`` without materializing the
+    document. Innings teams and over counts fill in as the stream is read;
+    top-level keys other than ``innings`` are kept whole in ``document``.
+    """
+
+    def __init__(self, fp, read_size=READ_SIZE):
+        self._reader = _Reader(fp, read_size)
+        self.document = {}
+        self.has_innings = False
+        self.innings_teams = []
+        self.innings_overs = []
+
+    def __iter__(self):
+        r = self._reader
+        for key in r.iter_object():
+            if key != "innings":
+                self.document[key] = r.value()
+                continue
+
+            self.has_innings = True
+            for _ in r.iter_array():
+                i = len(self.innings_teams)
+                self.innings_teams.append(None)
+                self.innings_overs.append(0)
+                for inning_key in r.iter_object():
+                    if inning_key == "team":
+                        self.innings_teams[i] = r.value()
+                    elif inning_key == "overs":
+                        for o, _ in enumerate(r.iter_array()):
+                            self.innings_overs[i] = o + 1
+                            for over_key in r.iter_object():
+                                if over_key != "deliveries":
+                                    r.value()
+                                    continue
+                                for b, _ in enumerate(r.iter_array()):
+                                    yield i, o, b, r.value()
+                    else:
+                        r.value()
+
+
+def _expect(value, kind):
+    if not isinstance(value, kind):
+        raise ValueError(f"Expected {'an array' if kind is list else 'an object'} but found {type(value).__name__}")
+    return value
+
+
+class DocumentStream:
+    """MatchStream's interface over an already parsed document."""
+
+    def __init__(self, document):
+        _expect(document, dict)
+        self.has_innings = "innings" in document
+        self.document = {k: v for k, v in document.items() if k != "innings"}
+        self._innings = [_expect(inning, dict) for inning in _expect(document.get("innings", []), list)]
+        self.innings_teams = [inning.get("team") for inning in self._innings]
+        self.innings_overs = [len(_expect(inning.get("overs", []), list)) for inning in self._innings]
+
+    def __iter__(self):
+        for i, inning in enumerate(self._innings):
+            for o, over in enumerate(inning.get("overs", [])):
+                for b, delivery in enumerate(_expect(_expect(over, dict).get("deliveries", []), list)):
+                    yield i, o, b, delivery
+
+
+def stream_match_aggregates(stream, chunk_size=CHUNK_DELIVERIES):
+    # Deliveries are gathered into small columnar chunks, aggregated and
+    # folded into the running totals, so memory stays bounded by the chunk
+    # size rather than the file size.
+    players, kinds = {}, {}
+    aggregates = empty_aggregates()
+    builder = DeliveryTableBuilder(players, kinds)
+
+    for innings, over, ball, delivery in stream:
+        builder.set_innings(innings, stream.innings_teams[innings], over + 1)
+        builder.add(innings, over, ball, delivery)
+        if len(builder) >= chunk_size:
+            aggregates = aggregates.merge(aggregate_table(builder.build()))
+            builder = DeliveryTableBuilder(players, kinds)
+    if len(builder):
+        aggregates = aggregates.merge(aggregate_table(builder.build()))
+
+    # Innings metadata can arrive after the deliveries (or belong to
+    # innings with no deliveries at all), so settle it from the stream.
+    tail = empty_aggregates()
+    tail.innings_teams = list(stream.innings_teams)
+    tail.over_runs = [np.zeros(n, dtype=np.int64) for n in stream.innings_overs]
+    tail.run_types = np.zeros((len(stream.innings_teams), 7), dtype=np.int64)
+    aggregates = aggregates.merge(tail)
+    aggregates.innings_teams = list(stream.innings_teams)
+    return aggregates
+
+
+@timed("json_load")
+def load_json_upload(fp):
+    """Read an uploaded JSON file.
+
+    Returns ``(document, aggregates)``. For match files the deliveries are
+    aggregated into MatchAggregates and left out of ``document``; files
+    over SMALL_UPLOAD_BYTES are streamed rather than parsed whole. For
+    player and team payloads ``aggregates`` is None and ``document`` is
+    the whole file, with a player payload's PlayerCube built once under
+    ``data[PLAYER_CUBE_KEY]``.
+    """
+    head = fp.read(SMALL_UPLOAD_BYTES + 1)
+    if len(head) <= SMALL_UPLOAD_BYTES:
+        stream = DocumentStream(json.loads(head))
+    else:
+        fp.seek(0)
+        stream = MatchStream(fp)
+    aggregates = stream_match_aggregates(stream)
+    if stream.has_innings:
+        return stream.document, aggregates
+    return attach_player_cube(stream.document), None
@@ -0,0 +1,49 @@
+from dataclasses import asdict, dataclass, field
+
+
+# Part of every cached result's key: bump it whenever a summarizer's text
+# or stats change so stale summaries stop being served.
+ENGINE_VERSION = "6"
+
+
+@dataclass
+class SummaryMessage:
+    level: str  # "success", "info", "warning" or "error"
+    text: str
+
+
+@dataclass
+class SummaryResult:
+    """What a summarizer found: rendered text plus the numbers behind it."""
+
+    graph_type: str
+    messages: list = field(default_factory=list)
+    stats: dict = field(default_factory=dict)
+
+    def success(self, text):
+        self.messages.append(SummaryMessage("success", text))
+
+    def info(self, text):
+        self.messages.append(SummaryMessage("info", text))
+
+    def warning(self, text):
+        self.messages.append(SummaryMessage("warning", text))
+
+    def error(self, text):
+        self.messages.append(SummaryMessage("error", text))
+
+    @property
+    def ok(self):
+        return any(m.level == "success" for m in self.messages)
+
+    @property
+    def text(self):
+        return "\n\n".join(m.text for m in self.messages)
+
+    def to_dict(self):
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, payload):
+        messages = [SummaryMessage(**m) for m in payload.get("messages", [])]
+        return cls(payload["graph_type"], messages, payload.get("stats", {}))
@@ -1,27 +1,33 @@
-import pytesseract
-from collections import defaultdict
-import streamlit as st
-from datetime import datetime
+from insights.ocr import detect_with_title_strips
+from insights.render import streamlit_adapter
+from insights.rules import classify_text
+from insights.summary import SummaryResult
+
+
+def detect_team_graph_type_from_text(text):
+    result = classify_text(text, category="team")
+    return result.graph_type if result else None
 
-def detect_team_graph_type_from_image(image):
-    try:
-        text = pytesseract.image_to_string(image).lower()
 
-        if "current form" in text or ("current form" in text and "result" in text):
-            return "team_current_form"
-        elif any(kw in text for kw in ["toss insights", "win toss", "bat first", "field first"]):
-            return "team_toss_insights"
+def detect_team_graph_type_from_image(image):
+    from insights.visual import predict_graph
 
+    found = predict_graph(image, category="team")
+    if found is not None:
+        return found[1]
+    try:
+        return detect_with_title_strips(image, detect_team_graph_type_from_text)
     except Exception as e:
         print("OCR failed for team graph:", e)
 
     return None
 
-def summarize_team_current_form(data):
+def team_current_form_summary(data):
+    result = SummaryResult("team_current_form")
     matches = data.get("graph_data", [])
     if not matches:
-        st.warning("No match data available for team current form.")
-        return
+        result.warning("No match data available for team current form.")
+        return result
 
     team_name = matches[0].get("team_name", "This team")
     total = len(matches)
@@ -32,10 +38,10 @@ def summarize_team_current_form(data):
     win_margins = []
 
     for match in matches:
-        result = match.get("match_result", "").lower()
-        if result == "abandoned":
+        outcome = match.get("match_result", "").lower()
+        if outcome == "abandoned":
             abandoned += 1
-        elif result == "resulted":
+        elif outcome == "resulted":
             if match.get("won_team_id") == team_id:
                 wins += 1
                 win_by = match.get("win_by", "")
@@ -59,15 +65,17 @@ def summarize_team_current_form(data):
     if win_margins:
         summary += f"\n\n🚀 Biggest win: **{max(win_margins, key=lambda s: len(s))}**."
 
-    st.success(summary.strip())
+    result.success(summary.strip())
+    result.stats.update(matches=total, wins=wins, losses=losses, abandoned=abandoned)
+    return result
 
-import streamlit as st
 
-def summarize_team_toss_insights(data):
+def team_toss_insights_summary(data):
+    result = SummaryResult("team_toss_insights")
     d = data.get("graph_data", {})
     if not d:
-        st.warning("No toss insights data found.")
-        return
+        result.warning("No toss insights data found.")
+        return result
 
     team = d.get("team_name", "This team")
     toss_won = d.get("won_toss", 0)
@@ -90,4 +98,11 @@ def summarize_team_toss_insights(data):
     else:
         summary += "🟡 Their toss outcomes show no strong preference between batting or fielding first."
 
-    st.success(summary.strip())
+    result.success(summary.strip())
+    result.stats.update(won_toss=toss_won, lost_toss=toss_lost, bat_first=bat_first,
+                        field_first=field_first, won_bat_first=won_bat, won_field_first=won_field)
+    return result
+
+
+summarize_team_current_form = streamlit_adapter(team_current_form_summary)
+summarize_team_toss_insights = streamlit_adapter(team_toss_insights_summary)
@@ -0,0 +1,281 @@
+"""Tell the graph type from how the image looks, without OCR.
+
+Our charts come out of one charting tool with fixed layouts and colours,
+so a thumbnail carries most of what OCR reads off the title. Each image is
+reduced to a 64x64 thumbnail and described by a colour histogram, edge
+orientation statistics, a coarse layout grid and a difference hash. A
+nearest-centroid model over those features is fitted from labelled
+samples and saved as .npz; near-duplicates of a training image are
+matched on the hash directly.
+
+    python -m insights.visual train model.npz samples/
+    python -m insights.visual evaluate model.npz samples/
+    python -m insights.visual predict model.npz chart.png [...]
+
+``samples/`` holds ``<category>/<graph_type>/*.png``.
+
+    VISUAL_MODEL           model file used by the detectors (default: none)
+    VISUAL_MIN_CONFIDENCE  below this the detectors fall back to OCR
+                           (default: 0.5)
+"""
+import os
+import sys
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+
+MODEL_VERSION = 1
+THUMBNAIL = 64
+LAYOUT_GRID = 8
+COLOUR_LEVELS = 4
+ORIENTATION_BINS = 8
+EDGE_THRESHOLD = 0.1
+# Hashes this close to a training image count as the same chart template.
+HASH_MATCH_BITS = 4
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+MIN_CONFIDENCE = float(os.environ.get("VISUAL_MIN_CONFIDENCE", 0.5))
+
+
+VisualPrediction = namedtuple("VisualPrediction", ["category", "graph_type", "confidence"])
+
+
+def _thumbnail(image, size=(THUMBNAIL, THUMBNAIL)):
+    from PIL import Image
+
+    if image.size == size and image.mode == "RGB":
+        return image
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image.resize(size, Image.BILINEAR, reducing_gap=2.0)
+
+
+def difference_hash(image):
+    # 64-bit dHash: is each pixel of a 9x8 grey thumbnail darker than its
+    # right-hand neighbour.
+    gray = np.asarray(_thumbnail(image, (9, 8)).convert("L"), dtype=np.int16)
+    bits = (gray[:, 1:] > gray[:, :-1]).ravel()
+    return int(np.packbits(bits).view(">u8")[0])
+
+
+def image_features(image):
+    """Feature vector for one PIL image (float32, fixed length)."""
+    rgb = np.asarray(_thumbnail(image), dtype=np.float32) / 255
+    gray = rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+    levels = np.minimum((rgb * COLOUR_LEVELS).astype(np.int64), COLOUR_LEVELS - 1)
+    colour = levels[..., 0] * COLOUR_LEVELS ** 2 + levels[..., 1] * COLOUR_LEVELS + levels[..., 2]
+    colour_hist = np.bincount(colour.ravel(), minlength=COLOUR_LEVELS ** 3) / colour.size
+
+    gy, gx = np.gradient(gray)
+    magnitude = np.hypot(gx, gy)
+    angle = np.mod(np.arctan2(gy, gx), np.pi)
+    bins = np.minimum((angle / np.pi * ORIENTATION_BINS).astype(np.int64), ORIENTATION_BINS - 1)
+    orientation = np.bincount(bins.ravel(), weights=magnitude.ravel(), minlength=ORIENTATION_BINS)
+    orientation /= max(orientation.sum(), 1e-6)
+    edge_density = (magnitude > EDGE_THRESHOLD).mean()
+
+    cell = THUMBNAIL // LAYOUT_GRID
+    layout = gray.reshape(LAYOUT_GRID, cell, LAYOUT_GRID, cell).mean(axis=(1, 3)).ravel()
+    edge_layout = magnitude.reshape(LAYOUT_GRID, cell, LAYOUT_GRID, cell).mean(axis=(1, 3)).ravel()
+
+    return np.concatenate([colour_hist, orientation, [edge_density], layout, edge_layout]).astype(np.float32)
+
+
+class VisualClassifier:
+    def __init__(self, labels, centroids, mean, scale, hashes, hash_labels):
+        self.labels = labels
+        self.centroids = centroids
+        self.mean = mean
+        self.scale = scale
+        self.hashes = hashes
+        self.hash_labels = hash_labels
+
+    def __repr__(self):
+        return f"VisualClassifier({len(self.labels)} graph types, {len(self.hashes)} samples)"
+
+    @classmethod
+    def fit(cls, samples):
+        """Fit from ``(image, category, graph_type)`` samples."""
+        labels, features, hashes, targets = {}, [], [], []
+        for image, category, graph_type in samples:
+            thumbnail = _thumbnail(image)
+            targets.append(labels.setdefault((category, graph_type), len(labels)))
+            features.append(image_features(thumbnail))
+            hashes.append(difference_hash(thumbnail))
+        if not features:
+            raise ValueError("No training samples")
+
+        features = np.stack(features)
+        targets = np.asarray(targets, dtype=np.int64)
+        mean = features.mean(axis=0)
+        scale = features.std(axis=0) + 1e-3
+        scaled = (features - mean) / scale
+        centroids = np.stack([scaled[targets == i].mean(axis=0) for i in range(len(labels))])
+        return cls(list(labels), centroids, mean, scale, np.asarray(hashes, dtype=np.uint64), targets)
+
+    def predict(self, image):
+        # Both the features and the hash come from one 64x64 thumbnail, so
+        # a large screenshot is only resampled once.
+        image = _thumbnail(image)
+        scaled = (image_features(image) - self.mean) / self.scale
+        distances = np.sqrt(((self.centroids - scaled) ** 2).sum(axis=1))
+        order = np.argsort(distances)
+        best = int(order[0])
+        # Margin between the nearest and the runner-up centroid: 0 when the
+        # image sits halfway between two graph types, 1 when it is on one.
+        confidence = 1 - distances[best] / distances[order[1]] if len(order) > 1 and distances[order[1]] > 0 else 1.0
+
+        # A near-duplicate of training images settles it, unless charts of
+        # different graph types also hash that close (same layout, only
+        # the title differs).
+        if len(self.hashes):
+            xor = self.hashes ^ np.uint64(difference_hash(image))
+            bits = np.unpackbits(xor.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+            near = np.unique(self.hash_labels[bits <= HASH_MATCH_BITS])
+            if len(near) == 1:
+                hash_confidence = 1 - bits.min() / 64
+                if near[0] != best or hash_confidence > confidence:
+                    best, confidence = int(near[0]), hash_confidence
+
+        category, graph_type = self.labels[best]
+        return VisualPrediction(category, graph_type, float(confidence))
+
+    def save(self, path):
+        np.savez(
+            path,
+            version=np.int64(MODEL_VERSION),
+            labels=np.array([f"{c}/{g}" for c, g in self.labels]),
+            centroids=self.centroids, mean=self.mean, scale=self.scale,
+            hashes=self.hashes, hash_labels=self.hash_labels,
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as f:
+            if int(f["version"]) != MODEL_VERSION:
+                raise ValueError(f"{path}: model version {int(f['version'])}, expected {MODEL_VERSION}")
+            labels = [tuple(label.split("/", 1)) for label in f["labels"].tolist()]
+            return cls(labels, f["centroids"], f["mean"], f["scale"], f["hashes"], f["hash_labels"])
+
+
+_classifier = None
+_classifier_loaded = False
+_classifier_lock = threading.Lock()
+
+
+def get_classifier():
+    # The VISUAL_MODEL classifier, loaded once; None when unset or unreadable.
+    global _classifier, _classifier_loaded
+    if not _classifier_loaded:
+        with _classifier_lock:
+            if not _classifier_loaded:
+                path = os.environ.get("VISUAL_MODEL")
+                if path:
+                    try:
+                        _classifier = VisualClassifier.load(path)
+                    except (OSError, ValueError, KeyError) as e:
+                        print("Visual model not loaded:", e)
+                _classifier_loaded = True
+    return _classifier
+
+
+def set_classifier(classifier):
+    global _classifier, _classifier_loaded
+    previous, _classifier, _classifier_loaded = _classifier, classifier, True
+    return previous
+
+
+def predict_graph(image, category=None):
+    """Confident ``(category, graph_type)`` for the image, else None.
+
+    With ``category`` given, a prediction for any other category is
+    treated as not confident.
+    """
+    classifier = get_classifier()
+    if classifier is None:
+        return None
+    try:
+        prediction = classifier.predict(image)
+    except Exception as e:
+        print("Visual detection failed:", e)
+        return None
+    if prediction.confidence < MIN_CONFIDENCE:
+        return None
+    if category is not None and prediction.category != category:
+        return None
+    return prediction.category, prediction.graph_type
+
+
+def labelled_images(root):
+    # (path, category, graph_type) for every image under root/<category>/<graph_type>/.
+    for category in sorted(os.listdir(root)):
+        category_dir = os.path.join(root, category)
+        if not os.path.isdir(category_dir):
+            continue
+        for graph_type in sorted(os.listdir(category_dir)):
+            graph_dir = os.path.join(category_dir, graph_type)
+            if not os.path.isdir(graph_dir):
+                continue
+            for name in sorted(os.listdir(graph_dir)):
+                if name.lower().endswith(IMAGE_SUFFIXES):
+                    yield os.path.join(graph_dir, name), category, graph_type
+
+
+def _open(path):
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image.load()
+        return image
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) < 3 or argv[0] not in ("train", "evaluate", "predict"):
+        print("usage: python -m insights.visual train|evaluate MODEL.npz SAMPLES_DIR", file=sys.stderr)
+        print("       python -m insights.visual predict MODEL.npz IMAGE [...]", file=sys.stderr)
+        return 2
+    command, model_path, paths = argv[0], argv[1], argv[2:]
+
+    if command == "train":
+        samples = ((_open(path), category, graph_type) for path, category, graph_type in labelled_images(paths[0]))
+        try:
+            classifier = VisualClassifier.fit(samples)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 1
+        classifier.save(model_path)
+        print(f"Saved {classifier} to {model_path}")
+        return 0
+
+    classifier = VisualClassifier.load(model_path)
+    if command == "predict":
+        for path in paths:
+            p = classifier.predict(_open(path))
+            print(f"{path}: {p.category}/{p.graph_type} ({p.confidence:.2f})")
+        return 0
+
+    total = correct = confident = confident_correct = 0
+    for path, category, graph_type in labelled_images(paths[0]):
+        p = classifier.predict(_open(path))
+        right = (p.category, p.graph_type) == (category, graph_type)
+        total += 1
+        correct += right
+        if p.confidence >= MIN_CONFIDENCE:
+            confident += 1
+            confident_correct += right
+        if not right:
+            print(f"{path}: predicted {p.category}/{p.graph_type} ({p.confidence:.2f})")
+    if not total:
+        print("No labelled images found", file=sys.stderr)
+        return 1
+    print(f"{correct}/{total} correct; {confident} above {MIN_CONFIDENCE} confidence, "
+          f"{confident_correct} of them correct")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""Local HTTP summary service.
+
+    python service.py --port 8080 --workers 4 --max-queue 16 --timeout 30
+
+    curl -F image=@worm.png -F json=@match.json localhost:8080/summarize
+    curl --data-binary @worm.png -H "Content-Type: image/png" localhost:8080/summarize
+    curl --data-binary @form.json -H "Content-Type: application/json" localhost:8080/summarize
+    curl --data-binary @match.json -H "Content-Type: application/json" \\
+        "localhost:8080/summarize?category=match&graph_type=Worm"
+
+``POST /summarize`` returns ``{"category", "graph_type", "summary", ...}``.
+Player and team JSON usually names its own graph; match JSON sent without
+an image needs ``category`` and ``graph_type`` query parameters.
+``GET /metrics`` serves Prometheus text, ``GET /healthz`` a liveness check.
+
+Requests are parsed and run in a bounded process pool, so the event loop
+only moves bytes. At most ``workers + max_queue`` jobs are admitted at once;
+beyond that the service answers 429 straight away. A job that overruns
+``--timeout`` gets a 504; it still counts towards the limit until its
+worker is free again. Results are cached across workers only when
+RESULT_CACHE_PATH is set (insights.result_cache).
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from email import policy
+from email.parser import BytesParser
+from urllib.parse import parse_qs, urlsplit
+
+from insights.metrics import METRICS, start_request, stage
+
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 32 * 1024 * 1024
+READ_TIMEOUT = 10
+ROUTES = ("/summarize", "/metrics", "/healthz")
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    411: "Length Required", 413: "Payload Too Large", 429: "Too Many Requests",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class BadRequest(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _parse_upload(content_type, body):
+    # Returns (image bytes or None, JSON bytes or None).
+    content_type = content_type.lower()
+    if content_type.startswith("multipart/form-data"):
+        message = BytesParser(policy=policy.HTTP).parsebytes(
+            b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+        )
+        if not message.is_multipart():
+            raise BadRequest("Malformed multipart body.")
+        parts = {}
+        for part in message.iter_parts():
+            name = part.get_param("name", header="content-disposition")
+            parts[name] = part.get_payload(decode=True)
+        return parts.get("image"), parts.get("json")
+    if content_type.startswith("image/"):
+        return body, None
+    if content_type.startswith("application/json"):
+        return None, body
+    raise BadRequest("Send multipart/form-data with image/json parts, an image/* body or an application/json body.")
+
+
+def run_job(content_type, body, category, graph_type):
+    # Runs in a pool worker: parse the upload, detect and summarize. Stage
+    # timings are returned so the front end can fold them into its metrics.
+    from insights.pipeline import UploadError, explain_bytes
+
+    records = start_request()
+    try:
+        image, document = _parse_upload(content_type, body)
+        if image is None and document is None:
+            raise BadRequest("Nothing to summarize: send an image, a JSON file or both.")
+        result = explain_bytes(image, document, category, graph_type)
+        status = 200
+    except (BadRequest, UploadError) as e:
+        status, result = 400, {"error": str(e)}
+    except Exception:
+        # A server fault, not the client's: the details go to the log only.
+        traceback.print_exc(file=sys.stderr)
+        status, result = 500, {"error": "Internal error."}
+    return status, result, [r.as_dict() for r in records]
+
+
+class ServiceStats:
+    def __init__(self):
+        self.in_flight = 0
+        self.responses = {}
+        self.rejected = 0
+        self.timeouts = 0
+
+    def prometheus_text(self, workers, max_queue):
+        lines = [
+            "# HELP graph_explainer_service_in_flight Jobs admitted and not yet finished (queued + running).",
+            "# TYPE graph_explainer_service_in_flight gauge",
+            f"graph_explainer_service_in_flight {self.in_flight}",
+            "# HELP graph_explainer_service_running Jobs currently running in a worker.",
+            "# TYPE graph_explainer_service_running gauge",
+            f"graph_explainer_service_running {min(self.in_flight, workers)}",
+            "# HELP graph_explainer_service_capacity Jobs admitted before requests get 429.",
+            "# TYPE graph_explainer_service_capacity gauge",
+            f"graph_explainer_service_capacity {workers + max_queue}",
+            "# HELP graph_explainer_service_rejected_total Requests refused because the queue was full.",
+            "# TYPE graph_explainer_service_rejected_total counter",
+            f"graph_explainer_service_rejected_total {self.rejected}",
+            "# HELP graph_explainer_service_timeouts_total Requests that ran past the timeout.",
+            "# TYPE graph_explainer_service_timeouts_total counter",
+            f"graph_explainer_service_timeouts_total {self.timeouts}",
+            "# HELP graph_explainer_service_responses_total Responses by HTTP status.",
+            "# TYPE graph_explainer_service_responses_total counter",
+        ]
+        for status, count in sorted(self.responses.items()):
+            lines.append(f'graph_explainer_service_responses_total{{status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+class SummaryService:
+    def __init__(self, workers=2, max_queue=16, timeout=30.0):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.stats = ServiceStats()
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    async def handle(self, reader, writer):
+        started = time.perf_counter()
+        status, body, content_type, headers = 500, b"", "application/json", {}
+        path = "-"
+        try:
+            method, path, query, request_headers, payload = await asyncio.wait_for(
+                self._read_request(reader), READ_TIMEOUT
+            )
+            status, body, content_type, headers = await self._route(method, path, query, request_headers, payload)
+        except BadRequest as e:
+            status, body = e.status, _json({"error": str(e)})
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        except Exception as e:
+            print("Request failed:", e, file=sys.stderr)
+            status, body = 500, _json({"error": "Internal error."})
+
+        self.stats.responses[status] = self.stats.responses.get(status, 0) + 1
+        route = path if path in ROUTES else "other"
+        METRICS.observe("http_request", {"path": route, "status": str(status)}, time.perf_counter() - started, None)
+        try:
+            writer.write(_response(status, body, content_type, headers))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.LimitOverrunError:
+            raise BadRequest("Request headers too large.", 413)
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise BadRequest("Malformed request line.")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        body = b""
+        if method == "POST":
+            if "content-length" not in headers:
+                raise BadRequest("Content-Length is required.", 411)
+            try:
+                length = int(headers["content-length"])
+            except ValueError:
+                raise BadRequest("Invalid Content-Length.")
+            if length > MAX_BODY_BYTES:
+                raise BadRequest(f"Body larger than {MAX_BODY_BYTES} bytes.", 413)
+            body = await reader.readexactly(length)
+
+        url = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return method, url.path, query, headers, body
+
+    async def _route(self, method, path, query, headers, body):
+        if path == "/healthz":
+            return 200, _json({"status": "ok"}), "application/json", {}
+        if path == "/metrics":
+            text = METRICS.prometheus_text() + self.stats.prometheus_text(self.workers, self.max_queue)
+            return 200, text.encode(), "text/plain; version=0.0.4", {}
+        if path != "/summarize":
+            return 404, _json({"error": "Not found."}), "application/json", {}
+        if method != "POST":
+            return 405, _json({"error": "Use POST."}), "application/json", {"Allow": "POST"}
+
+        status, result = await self.submit(
+            headers.get("content-type", ""), body, query.get("category"), query.get("graph_type")
+        )
+        extra = {"Retry-After": "1"} if status in (429, 503) else {}
+        return status, _json(result), "application/json", extra
+
+    async def submit(self, content_type, body, category=None, graph_type=None):
+        # Admission control: refuse rather than queue without bound.
+        if self.stats.in_flight >= self.workers + self.max_queue:
+            self.stats.rejected += 1
+            return 429, {"error": "Server busy, try again shortly."}
+
+        self.stats.in_flight += 1
+        loop = asyncio.get_running_loop()
+        try:
+            future = self.pool.submit(run_job, content_type, body, category, graph_type)
+        except BrokenProcessPool:
+            self._restart_pool()
+            self.stats.in_flight -= 1
+            return 503, {"error": "Worker pool restarted, try again."}
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._job_done))
+
+        try:
+            with stage("service_job"):
+                status, result, records = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            # A job still waiting is dropped; one already running cannot be
+            # interrupted and keeps its slot until it finishes.
+            self.stats.timeouts += 1
+            return 504, {"error": f"Timed out after {self.timeout:g}s."}
+        except BrokenProcessPool:
+            self._restart_pool()
+            return 503, {"error": "A worker crashed, try again."}
+
+        for r in records:
+            METRICS.observe(r["stage"], r["labels"], r["seconds"], r["peak_bytes"])
+        return status, result
+
+    def _job_done(self):
+        self.stats.in_flight -= 1
+
+    def _restart_pool(self):
+        print("Worker pool broke; starting a new one.", file=sys.stderr)
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        self.pool = ProcessPoolExecutor(max_workers=self.workers)
+
+
+def _json(payload):
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _response(status, body, content_type, headers):
+    head = [f"HTTP/1.1 {status} {REASONS.get(status, 'Unknown')}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close"]
+    head += [f"{k}: {v}" for k, v in headers.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def serve(host, port, workers, max_queue, timeout):
+    service = SummaryService(workers, max_queue, timeout)
+    server = await asyncio.start_server(service.handle, host, port, limit=MAX_HEADER_BYTES)
+    print(f"Serving on http://{host}:{port} ({workers} workers, queue {max_queue}, timeout {timeout:g}s)",
+          file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve graph summaries over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("-w", "--workers", type=int, default=2, help="OCR/summary worker processes")
+    parser.add_argument("-q", "--max-queue", type=int, default=16, help="jobs allowed to wait for a worker before 429")
+    parser.add_argument("-t", "--timeout", type=float, default=30.0, help="seconds before a request gets 504")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.max_queue, args.timeout))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
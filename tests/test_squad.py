@@ -0,0 +1,62 @@
+import json
+
+from insights import player_insights, squad
+
+
+def _form(*rows):
+    return {"data": {"current_form_graph_data": list(rows)}}
+
+
+GOOD = _form({"runs": 30, "balls": 20, "is_out": 1, "out_type": "caught"},
+             {"runs": 12, "balls": 15, "is_out": 0, "out_type": ""})
+BAD = _form({"runs": 50, "balls": 40, "is_out": 1, "out_type": "bowled"},
+            {"runs": 8, "is_out": 1, "out_type": "lbw"})
+
+
+def test_malformed_upload_leaves_builder_unchanged():
+    builder = squad.SquadBuilder().add("alice", GOOD)
+    try:
+        builder.add("ghost", BAD)
+    except KeyError:
+        pass
+    builder.add("bob", GOOD)
+
+    built = builder.build()
+    assert built.names == ["alice", "bob"]
+    assert built.dismissal_kinds == ["caught"]
+    assert built.form()["innings"].tolist() == [2, 2]
+
+
+def test_cli_skips_malformed_file(tmp_path, capsys):
+    paths = []
+    for name, payload in (("alice", GOOD), ("ghost", BAD), ("bob", GOOD)):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(payload), encoding="utf-8")
+        paths.append(str(path))
+
+    assert squad.main(paths) == 0
+    out, err = capsys.readouterr()
+    assert "skipped" in err and "ghost" in err
+    assert sorted(json.loads(line)["player"] for line in out.splitlines()) == ["alice", "bob"]
+
+
+def _vs_bowling(*rows):
+    return {"data": {"graph_data": [{"bowling_type": t, "average": str(a), "strike_rate": "100", "wicket": f"{w}%"}
+                                    for t, a, w in rows]}}
+
+
+def test_duplicate_bowling_types_match_single_player_summary():
+    rows = [("Pace", 50, 5), ("Spin", 40, 20), ("Pace", 30, 10)]
+    single = player_insights.vs_bowling_type_summary(_vs_bowling(*rows)["data"]).stats
+    row = squad.load_squad({"alice": _vs_bowling(*rows)}).compare()[0]
+    assert (row["best_vs"], row["best_vs_average"]) == ("Pace", 50)
+    assert row["weak_vs"] == "Spin"
+    assert (row["best_vs"], row["weak_vs"]) == (single["best_type"], single["weak_type"])
+
+
+def test_player_uploaded_twice_keeps_both_uploads_rows():
+    built = squad.load_squad({"alice": [_vs_bowling(("Spin", 40, 5), ("Pace", 50, 5)),
+                                        _vs_bowling(("Pace", 10, 5), ("Spin", 50, 5))]})
+    row = built.compare()[0]
+    # The second upload neither overwrites Pace's 50 nor wins the tie with it.
+    assert (row["best_vs"], row["best_vs_average"]) == ("Pace", 50)
@@ -0,0 +1,33 @@
+import io
+import json
+
+import pytest
+
+from insights.stream import MatchStream, load_json_upload, stream_match_aggregates
+
+
+DOCUMENT = {"version": 12.75, "scale": -3e+10, "ratios": [1.5e-3, 2E5, 0.25], "innings": []}
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 4, 5, 7, 15, 64])
+def test_numbers_split_across_reads(read_size):
+    stream = MatchStream(io.BytesIO(json.dumps(DOCUMENT).encode()), read_size)
+    stream_match_aggregates(stream)
+    assert stream.document == {k: v for k, v in DOCUMENT.items() if k != "innings"}
+
+
+def test_small_upload_matches_stream():
+    match = {"info": {"version": 1.5}, "innings": [
+        {"team": "A", "overs": [{"deliveries": [
+            {"batter": "x", "non_striker": "y", "runs": {"batter": 4, "extras": 0, "total": 4}},
+            {"batter": "x", "non_striker": "y", "runs": {"batter": 0, "extras": 0, "total": 0},
+             "wickets": [{"kind": "bowled"}]},
+        ]}]},
+    ]}
+    raw = json.dumps(match).encode()
+    document, aggregates = load_json_upload(io.BytesIO(raw))
+    stream = MatchStream(io.BytesIO(raw), 3)
+    streamed = stream_match_aggregates(stream)
+    assert document == stream.document == {"info": {"version": 1.5}}
+    assert aggregates.wicket_counts == streamed.wicket_counts == {"bowled": 1}
+    assert [list(o) for o in aggregates.over_runs] == [list(o) for o in streamed.over_runs] == [[4]]